@@ -1,7 +1,11 @@
 import os
-import re
+import sys
 import csv
 
+# Make the shared imm_tools package importable when run from this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from imm_tools.cache import cached_parse
+
 # Directory containing the log files
 log_dir = "results"
 
@@ -14,59 +18,26 @@ with open(output_file, mode='w', newline='') as file:
     # UPDATED HEADERS: Only including repetition, algorithm, k, and total time
     writer.writerow(["repetition", "algorithm", "k", "total time"])
 
-    # Loop through the files in the results folder
+    # Parse the log files in the results folder; unchanged logs come from .parse_cache.sqlite
     try:
-        filenames = os.listdir(log_dir)
+        parsed = cached_parse(log_dir)
     except FileNotFoundError:
         print(f"Error: Directory '{log_dir}' not found. Please ensure your log files are in a folder named 'results'.")
-        filenames = []
-
-    for filename in filenames:
-        # UPDATED FILTER: Only process files that start with 'log_k' and end with '.txt'.
-        # This excludes files starting with 'inf_k' and 'time_k'.
-        if filename.startswith("log_k") and filename.endswith(".txt"):
-            
-            # The regex pattern: (?:inf|log)_k(\d+)_(\d+)D_r(\d+)\.txt
-            # We are now guaranteed to be matching 'log' files
-            match = re.match(r'log_k(\d+)_(\d+)D_r(\d+)\.txt', filename)
-            
-            if match:
-                k_value = int(match.group(1))
-                algorithm = f"{match.group(2)}D"
-                repetition = int(match.group(3))
-            else:
-                # Fallback pattern for files that don't match the primary pattern, though less likely now
-                match_v2 = re.match(r'log_k(\d+)_(\d)D_r(\d+)\.txt', filename)
-                if match_v2:
-                    k_value = int(match_v2.group(1))
-                    algorithm = f"{match_v2.group(2)}D"
-                    repetition = int(match_v2.group(3))
-                else:
-                    # Skip files that don't match the expected pattern
-                    print(f"Skipping file due to unexpected name pattern: {filename}")
-                    continue
-
-            # Parse the log file to extract relevant time data
-            file_path = os.path.join(log_dir, filename)
-            try:
-                with open(file_path, 'r') as log_file:
-                    log_content = log_file.read()
+        parsed = []
 
-                    # Extract only the Total Time using regex
-                    total_time_match = re.search(r'Total Time:\s+([0-9.]+)\s+seconds', log_content)
-                    
-                    if total_time_match:
-                        total_time = total_time_match.group(1)
+    for run, _ in parsed:
+        filename = run["file"]
 
-                        # Write the extracted data to the CSV, including only the total time
-                        writer.writerow([repetition, algorithm, k_value, total_time])
-                    else:
-                         print(f"Warning: Could not find 'Total Time' metric in {filename}. Skipping.")
+        # Only log_k<k>_<a>D_r<r>.txt files belong to the k sweep
+        if run["campaign"] != "k":
+            print(f"Skipping file due to unexpected name pattern: {filename}")
+            continue
 
-            except FileNotFoundError:
-                print(f"Error: File not found at {file_path}. Skipping.")
-            except Exception as e:
-                print(f"Error processing file {filename}: {e}. Skipping.")
+        if run["total_time"] is not None:
+            # Write the extracted data to the CSV, including only the total time
+            writer.writerow([run["repetition"], run["algorithm"], run["k"], run["total_time"]])
+        else:
+            print(f"Warning: Could not find 'Total Time' metric in {filename}. Skipping.")
 
 
 print("Results have been saved to", output_file)
@@ -1,7 +1,11 @@
 import os
-import re
+import sys
 import csv
 
+# Make the shared imm_tools package importable when run from this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from imm_tools.cache import cached_parse
+
 # Directory containing the log files
 log_dir = "results"
 
@@ -13,43 +17,16 @@ with open(output_file, mode='w', newline='') as file:
     writer = csv.writer(file)
     writer.writerow(["nodes", "cores", "repetition", "algorithm", "total time", "generateRR time", "selectseeds time"])
 
-    # Loop through the files in the results folder
-    for filename in os.listdir(log_dir):
-        # Only process files that are log files and skip time files
-        if filename.endswith(".txt") and "time" not in filename:
-            # Extract the algorithm type (1D or 2D) from the file name
-            if "1D" in filename:
-                algorithm = "1D"
-            elif "2D" in filename:
-                algorithm = "2D"
-            else:
-                continue  # Skip files that don't match the expected pattern
-
-            # Extract the nodes, cores, and repetition from the filename
-            match = re.match(r'log_(\d+)n_(\d+)c_(\d)D_r(\d+)\.txt', filename)
-            if match:
-                nodes = int(match.group(1))
-                cores = int(match.group(2))
-                repetition = int(match.group(4))
-            else:
-                continue  # Skip files that don't match the expected pattern
-
-            # Parse the log file to extract relevant time data
-            with open(os.path.join(log_dir, filename), 'r') as log_file:
-                log_content = log_file.read()
-
-                # Extract the relevant times using regex
-                total_time_match = re.search(r'Total Time:\s+([0-9.]+)\s+seconds', log_content)
-                generateRR_time_match = re.search(r'Total Time\(generateRR\):\s+([0-9.]+)\s+seconds', log_content)
-                selectseeds_time_match = re.search(r'Total Time\(selectseeds\):\s+([0-9.]+)\s+seconds', log_content)
-
-                if total_time_match and generateRR_time_match and selectseeds_time_match:
-                    total_time = total_time_match.group(1)
-                    generateRR_time = generateRR_time_match.group(1)
-                    selectseeds_time = selectseeds_time_match.group(1)
-
-                    # Write the extracted data to the CSV
-                    writer.writerow([nodes, cores, repetition, algorithm, total_time, generateRR_time, selectseeds_time])
+    # Only new or modified logs are parsed; the rest come from .parse_cache.sqlite
+    for run, _ in cached_parse(log_dir):
 
-print("Results have been saved to", output_file)
+        # Skip files that don't match the expected log_<n>n_<c>c_<a>D_r<r>.txt pattern
+        if run["campaign"] != "scaling" or run["algorithm"] not in ("1D", "2D"):
+            continue
 
+        if run["total_time"] is not None and run["generateRR_time"] is not None and run["selectseeds_time"] is not None:
+            # Write the extracted data to the CSV
+            writer.writerow([run["nodes"], run["cores"], run["repetition"], run["algorithm"],
+                             run["total_time"], run["generateRR_time"], run["selectseeds_time"]])
+
+print("Results have been saved to", output_file)
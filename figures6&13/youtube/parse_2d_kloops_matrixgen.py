@@ -1,49 +1,31 @@
 #!/usr/bin/env python3
 import os
-import re
+import sys
 import csv
 
+# Make the shared imm_tools package importable when run from this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from imm_tools.cache import cached_parse
+
 LOG_DIR = "results"
 OUTPUT_CSV = "matrix_kloops_times.csv"
 
-# Regex to extract nodes, cores, repetition from filename
-# Example: log_1n_48c_2D_r1.txt
-fname_re = re.compile(r"log_(\d+)n_(\d+)c_2D_r(\d+)\.txt$")
-
-# Regex to extract the "Time until now" values
-matrix_re = re.compile(r"\[Time until now\] in matrixGen:\s+([0-9.]+)\s+seconds")
-kloops_re = re.compile(r"\[Time until now\] in k loops:\s+([0-9.]+)\s+seconds")
-
 rows = []
 
-for fname in os.listdir(LOG_DIR):
-    # Only process Actor IMM 2D logs
-    if not fname.startswith("log_") or "2D" not in fname or not fname.endswith(".txt"):
-        continue
+# Only new or modified logs are parsed; the rest come from .parse_cache.sqlite
+for run, _ in cached_parse(LOG_DIR):
 
-    m = fname_re.match(fname)
-    if not m:
+    # Only process Actor IMM 2D logs, e.g. log_1n_48c_2D_r1.txt
+    if run["campaign"] != "scaling" or run["algorithm"] != "2D":
         continue
 
-    nodes = int(m.group(1))
-    cores = int(m.group(2))
-    rep   = int(m.group(3))
-
-    last_matrix = None
-    last_kloops = None
-
-    with open(os.path.join(LOG_DIR, fname), "r") as f:
-        for line in f:
-            mm = matrix_re.search(line)
-            if mm:
-                last_matrix = float(mm.group(1))
-            mk = kloops_re.search(line)
-            if mk:
-                last_kloops = float(mk.group(1))
+    # matrixGen_time / kloops_time hold the last "[Time until now]" values
+    last_matrix = run["matrixGen_time"]
+    last_kloops = run["kloops_time"]
 
     # Only write a row if we found both timings
     if last_matrix is not None and last_kloops is not None:
-        rows.append([nodes, cores, rep, last_kloops, last_matrix])
+        rows.append([run["nodes"], run["cores"], run["repetition"], last_kloops, last_matrix])
 
 # Write CSV
 with open(OUTPUT_CSV, "w", newline="") as out:
@@ -52,4 +34,3 @@ with open(OUTPUT_CSV, "w", newline="") as out:
     writer.writerows(rows)
 
 print(f"Wrote {len(rows)} rows to {OUTPUT_CSV}")
-
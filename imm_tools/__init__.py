@@ -0,0 +1,5 @@
+# Shared tooling for the Actor IMM reproducibility scripts.
+#
+# The per-figure scripts under figure8/, figure10/ and figures6&13/ import
+# from this package (they add the repository root to sys.path first), so the
+# log format only has to be understood in one place.
@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+import sys
+
+from imm_tools.logparse import list_logs, parse_log
+
+# Incremental parse cache.
+#
+# Parsed logs are kept in a small SQLite file inside the directory holding
+# them (e.g. figure8/DBLP/results/.parse_cache.sqlite), so every log directory
+# has its own cache and entries keyed by file name cannot collide. A log is
+# only parsed again when its size or modification time changed, and entries
+# of logs that were deleted are evicted, so re-ingesting after one new
+# repetition only touches the new files. Directories where the cache cannot
+# be created or written (read-only checkouts, shared results trees) are
+# parsed without one.
+
+CACHE_FILE = ".parse_cache.sqlite"
+
+# Bump when parse_log starts producing different fields, so stale entries are
+# dropped instead of being served with missing or outdated metrics
+CACHE_VERSION = 1
+
+
+def cache_path(log_dir):
+    """Location of the sidecar cache for a results directory."""
+    return os.path.join(os.path.abspath(log_dir), CACHE_FILE)
+
+
+class ParseCache:
+    """Per-directory cache of parse_log results keyed on file size and mtime."""
+
+    def __init__(self, log_dir, path=None):
+        self.log_dir = log_dir
+        self.conn = sqlite3.connect(path or cache_path(log_dir))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS logs ("
+            "name TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, run TEXT, rounds TEXT)")
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or int(row[0]) != CACHE_VERSION:
+            self.conn.execute("DELETE FROM logs")
+        # Written on every open, so a cache that can be read but not written
+        # fails here rather than halfway through an ingest
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(CACHE_VERSION),))
+        self.conn.commit()
+
+        self.entries = {
+            name: (size, mtime_ns, run, rounds)
+            for name, size, mtime_ns, run, rounds in self.conn.execute("SELECT * FROM logs")
+        }
+
+    def lookup(self, path):
+        """Cached (run, rounds) for path, or None if it is new or modified."""
+        entry = self.entries.get(os.path.basename(path))
+        if entry is None:
+            return None
+        stat = os.stat(path)
+        if entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+            return None
+        return json.loads(entry[2]), json.loads(entry[3])
+
+    def store(self, path, run, rounds):
+        stat = os.stat(path)
+        name = os.path.basename(path)
+        entry = (stat.st_size, stat.st_mtime_ns, json.dumps(run), json.dumps(rounds))
+        self.entries[name] = entry
+        self.conn.execute("INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?, ?)", (name,) + entry)
+
+    def evict_missing(self, paths):
+        """Drop entries whose log is no longer among paths."""
+        present = {os.path.basename(path) for path in paths}
+        for name in [name for name in self.entries if name not in present]:
+            del self.entries[name]
+            self.conn.execute("DELETE FROM logs WHERE name = ?", (name,))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def open_cache(log_dir):
+    """ParseCache for log_dir, or None with a warning if it cannot be written."""
+    try:
+        return ParseCache(log_dir)
+    except (sqlite3.Error, OSError) as error:
+        sys.stderr.write(f"warning: no parse cache for {log_dir} ({error}); parsing every log\n")
+        return None
+
+
+def cached_parse(log_dir, use_cache=True):
+    """parse_log for every log in log_dir, reusing cached results where possible.
+
+    Returns a list of (run, rounds) pairs in file-name order.
+    """
+    paths = list_logs(log_dir)
+    cache = open_cache(log_dir) if use_cache else None
+    if cache is None:
+        return [parse_log(path) for path in paths]
+
+    try:
+        parsed = []
+        for path in paths:
+            result = cache.lookup(path)
+            if result is None:
+                result = parse_log(path)
+                cache.store(path, *result)
+            parsed.append(result)
+        cache.evict_missing(paths)
+    finally:
+        cache.close()
+    return parsed
@@ -0,0 +1,219 @@
+import argparse
+import os
+
+import matplotlib
+matplotlib.use("Agg")  # non-interactive: render straight to files, never block
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from imm_tools.store import DEFAULT_STORE, read_runs
+
+# Strong-scaling efficiency and phase-breakdown report.
+#
+# Usage (from the repository root, after ingesting into results.parquet):
+#   python -m imm_tools.efficiency -d report
+#
+# One pass over the scaling campaign of every dataset writes
+#   efficiency.csv   per (dataset, algorithm, cores): mean time of the total
+#                    and of every phase, speedup and parallel efficiency
+#                    relative to the smallest core count, and each phase's
+#                    share of the total
+#   stalls.csv       per (dataset, algorithm, phase): the first core count
+#                    at which the phase got no faster, and its efficiency
+#                    at the largest core count (phases that never reach 5%
+#                    of the total are left out)
+#   phase_share.png  stacked bars of the phase shares, one panel per
+#                    dataset and algorithm
+#   efficiency.png   efficiency of the total and of each phase
+#
+# The phases are disjoint so the shares add up to one: selectseeds time is
+# split into matrixGen, k loops and the remaining selection work (all of it
+# for 1D), and "other" is what Total Time has beyond generateRR and
+# selectseeds (reading the graph, setup).
+
+GROUP_FIELDS = ["dataset", "algorithm"]
+
+COMPONENTS = ["generateRR", "matrixGen", "kloops", "selection", "other"]
+
+COMPONENT_COLORS = {
+    "generateRR": "tab:blue",
+    "matrixGen": "black",
+    "kloops": "orange",
+    "selection": "tab:green",
+    "other": "tab:gray",
+}
+
+EFFICIENCY_FIELDS = GROUP_FIELDS + ["cores", "runs", "total_time", "speedup", "efficiency"] + [
+    f"{component}_time" for component in COMPONENTS
+] + [f"{component}_share" for component in COMPONENTS] + [
+    f"{component}_efficiency" for component in COMPONENTS
+]
+
+# Phases below this share of the total at every core count are too small
+# for their scaling to matter (or to be timed reliably)
+MIN_SHARE = 0.05
+
+STALL_FIELDS = GROUP_FIELDS + ["phase", "stall_cores", "best_cores", "final_efficiency"]
+
+READ_COLUMNS = GROUP_FIELDS + ["campaign", "cores", "total_time", "generateRR_time",
+                               "selectseeds_time", "matrixGen_time", "kloops_time"]
+
+
+def components(df):
+    """Per-run disjoint phase times: COMPONENTS columns added to a run table."""
+    df = df.dropna(subset=["total_time"]).copy()
+    matrix = df["matrixGen_time"].fillna(0.0)
+    kloops = df["kloops_time"].fillna(0.0)
+    select = df["selectseeds_time"].fillna(0.0)
+    rr = df["generateRR_time"].fillna(0.0)
+    df["generateRR_time"] = rr
+    df["matrixGen_time"] = matrix
+    df["kloops_time"] = kloops
+    # Timer rounding can leave tiny negative remainders
+    df["selection_time"] = (select - matrix - kloops).clip(lower=0.0)
+    df["other_time"] = (df["total_time"] - rr - select).clip(lower=0.0)
+    return df
+
+
+def efficiency_table(df):
+    """EFFICIENCY_FIELDS rows for all datasets and algorithms at once."""
+    df = components(df)
+    times = ["total_time"] + [f"{component}_time" for component in COMPONENTS]
+    table = df.groupby(GROUP_FIELDS + ["cores"], sort=True)[times].mean()
+    table["runs"] = df.groupby(GROUP_FIELDS + ["cores"]).size()
+    table = table.reset_index()
+
+    # Reference: the smallest core count of each dataset and algorithm
+    first = table.groupby(GROUP_FIELDS).transform("first")
+    for column in times:
+        speedup = first[column] / table[column].where(table[column] > 0)
+        name = "efficiency" if column == "total_time" else column.replace("_time", "_efficiency")
+        table[name] = speedup * first["cores"] / table["cores"]
+        if column == "total_time":
+            table["speedup"] = speedup
+        else:
+            table[column.replace("_time", "_share")] = table[column] / table["total_time"]
+    return table[EFFICIENCY_FIELDS]
+
+
+def stall_table(table, min_share=MIN_SHARE):
+    """Per phase: the first core count whose mean time is not below the previous one."""
+    rows = []
+    for key, group in table.groupby(GROUP_FIELDS, sort=True):
+        group = group.sort_values("cores")
+        cores = group["cores"].to_numpy()
+        for phase in ["total"] + COMPONENTS:
+            times = group[f"{phase}_time"].to_numpy()
+            if phase != "total" and not (group[f"{phase}_share"] >= min_share).any():
+                continue
+            stalled = np.nonzero(np.diff(times) >= 0)[0]
+            efficiency = group["efficiency" if phase == "total" else f"{phase}_efficiency"].to_numpy()
+            rows.append(dict(zip(GROUP_FIELDS, key), **{
+                "phase": phase,
+                "stall_cores": int(cores[stalled[0] + 1]) if len(stalled) else None,
+                "best_cores": int(cores[np.nanargmin(times)]),
+                "final_efficiency": float(efficiency[-1]),
+            }))
+    stalls = pd.DataFrame(rows, columns=STALL_FIELDS)
+    stalls["stall_cores"] = stalls["stall_cores"].astype("Int64")
+    # Phases that stop scaling first come first within each dataset and algorithm
+    return stalls.sort_values(GROUP_FIELDS + ["stall_cores"], na_position="last", kind="stable")
+
+
+def _panels(table):
+    keys = list(table.groupby(GROUP_FIELDS, sort=True).groups)
+    datasets = sorted({dataset for dataset, _ in keys})
+    algorithms = sorted({algorithm for _, algorithm in keys})
+    fig, axes = plt.subplots(len(datasets), len(algorithms), squeeze=False,
+                             figsize=(6 * len(algorithms), 4 * len(datasets)))
+    for i, dataset in enumerate(datasets):
+        for j, algorithm in enumerate(algorithms):
+            group = table[(table["dataset"] == dataset) & (table["algorithm"] == algorithm)]
+            yield fig, axes[i][j], f"{dataset} {algorithm}", group.sort_values("cores")
+
+
+def plot_shares(table, output):
+    """Stacked bars of each phase's share of the total, per core count."""
+    fig = None
+    for fig, ax, title, group in _panels(table):
+        x = np.arange(len(group))
+        bottom = np.zeros(len(group))
+        for component in COMPONENTS:
+            share = group[f"{component}_share"].fillna(0.0).to_numpy()
+            if not share.any():
+                continue
+            ax.bar(x, share, bottom=bottom, width=0.75, label=component,
+                   color=COMPONENT_COLORS[component])
+            bottom += share
+        # Mean total time above each bar
+        for position, total in zip(x, group["total_time"]):
+            ax.text(position, 1.01, f"{total:.2g}s", ha="center", va="bottom", fontsize=8)
+        ax.set_xticks(x, group["cores"].astype(str))
+        ax.set_ylim(0, 1.1)
+        ax.set_title(title)
+        ax.set_xlabel("Cores")
+        ax.set_ylabel("Share of total time")
+        ax.legend(fontsize=8, loc="lower left")
+    if fig is not None:
+        fig.tight_layout()
+        fig.savefig(output)
+        plt.close(fig)
+
+
+def plot_efficiency(table, output):
+    """Parallel efficiency of the total and of every phase above MIN_SHARE against core count."""
+    fig = None
+    for fig, ax, title, group in _panels(table):
+        ax.plot(group["cores"], group["efficiency"], marker="o", color="red", linewidth=2, label="total")
+        for component in COMPONENTS:
+            if not (group[f"{component}_share"] >= MIN_SHARE).any():
+                continue
+            ax.plot(group["cores"], group[f"{component}_efficiency"], marker=".", linestyle="--",
+                    color=COMPONENT_COLORS[component], label=component)
+        ax.set_xscale("log", base=2)
+        ax.set_xticks(group["cores"], group["cores"].astype(str))
+        ax.minorticks_off()
+        ax.axhline(1.0, color="gray", linewidth=0.5)
+        ax.set_ylim(bottom=0)
+        ax.set_title(title)
+        ax.set_xlabel("Cores")
+        ax.set_ylabel("Parallel efficiency")
+        ax.grid(True, which="major", ls="--", linewidth=0.5)
+        ax.legend(fontsize=8)
+    if fig is not None:
+        fig.tight_layout()
+        fig.savefig(output)
+        plt.close(fig)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Strong-scaling efficiency and phase breakdown of every dataset.")
+    parser.add_argument("-i", "--input", default=DEFAULT_STORE,
+                        help="ingested run table (.parquet store or ingest CSV)")
+    parser.add_argument("--campaign", default="scaling", help="campaign whose runs vary the core count")
+    parser.add_argument("-d", "--output-dir", default="report", help="directory for the tables and figures")
+    args = parser.parse_args(argv)
+
+    df = read_runs(args.input, columns=READ_COLUMNS, filters=[("campaign", "==", args.campaign)])
+    table = efficiency_table(df)
+    if table.empty:
+        print(f"No {args.campaign} runs in {args.input}; nothing to report")
+        return
+    stalls = stall_table(table)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    table.to_csv(os.path.join(args.output_dir, "efficiency.csv"), index=False)
+    stalls.to_csv(os.path.join(args.output_dir, "stalls.csv"), index=False)
+    plot_shares(table, os.path.join(args.output_dir, "phase_share.png"))
+    plot_efficiency(table, os.path.join(args.output_dir, "efficiency.png"))
+
+    for key, group in stalls[stalls["phase"] != "total"].groupby(GROUP_FIELDS, sort=True):
+        first = group.iloc[0]
+        if pd.notna(first["stall_cores"]):
+            print(f"{key[0]:>14} {key[1]}: {first['phase']} stops scaling first, at {int(first['stall_cores'])} cores")
+    print(f"Wrote {len(table)} rows and the figures to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import matplotlib
+matplotlib.use("Agg")  # non-interactive: render straight to files, never block
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from imm_tools.outliers import EXCLUSIONS_FILE, drop_excluded, excluded_runs, warn_unmatched
+from imm_tools.stats import group_ci
+from imm_tools.store import DEFAULT_STORE, REPO_ROOT, load_results, pa, read_store
+
+# Unified figure generation.
+#
+# Usage (from the repository root):
+#   python -m imm_tools.figures                  # every figure, in parallel
+#   python -m imm_tools.figures fig6_dblp fig8_youtube
+#
+# Each entry of FIGURES names the figure kind, the dataset filter, the title
+# and where the PNG goes. The plot_*.py scripts in the figure directories
+# render their single entry through render_figure. Figures are rendered in
+# separate worker processes on the Agg backend.
+#
+# A figure is only redrawn when its content hash changes: the hash of the
+# data slice, the figure parameters and the plotting code is kept next to
+# the PNG (.fig6_dblp.png.sha256) and compared before rendering.
+#
+# Runs listed in exclusions.csv (see imm_tools.outliers; --exclusions names
+# another file) are left out of the figures read from the store;
+# --keep-outliers plots them anyway.
+
+# kind -> (campaign, fallback CSV in the figure directory)
+KINDS = {
+    "scaling": ("scaling", "results.csv"),
+    "k": ("k", "results_parsed.csv"),
+    "eps": ("eps", "results.csv"),
+    "phases": ("scaling", "matrix_kloops_times.csv"),
+}
+
+FIGURES = {
+    "fig6_dblp": dict(kind="scaling", dataset="com-dblp", title="com-DBLP",
+                      directory="figures6&13/com-DBLP", output="fig6_dblp.png"),
+    "fig6_youtube": dict(kind="scaling", dataset="com-youtube", title="com-youtube",
+                         directory="figures6&13/youtube", output="fig6_youtube.png"),
+    # The soc-Epinions1 figure has always been saved as fig6_dblp.png
+    "fig6_epinions": dict(kind="scaling", dataset="soc-Epinions1", title="soc-Epinions1",
+                          directory="figures6&13/soc-Epinions", output="fig6_dblp.png"),
+    "fig8_dblp": dict(kind="k", dataset="com-dblp", title="com-DBLP",
+                      directory="figure8/DBLP", output="fig8_dblp.png"),
+    "fig8_youtube": dict(kind="k", dataset="com-youtube", title="com-youtube",
+                         directory="figure8/youtube", output="fig8_youtube.png"),
+    "fig10_dblp": dict(kind="eps", dataset="com-dblp", title="com-DBLP",
+                       directory="figure10/dblp", output="fig10_dblp.png"),
+    "fig10_youtube": dict(kind="eps", dataset="com-youtube", title="com-youtube",
+                          directory="figure10/youtube", output="fig10_youtube.png"),
+    "fig13_dblp": dict(kind="phases", dataset="com-dblp", title="com-DBLP",
+                       directory="figures6&13/com-DBLP", output="fig13_dblp.png"),
+    "fig13_youtube": dict(kind="phases", dataset="com-youtube", title="com-youtube",
+                          directory="figures6&13/youtube", output="fig13_youtube.png"),
+}
+
+# Define colors (Orange for 1D, Blue for 2D)
+COLORS = {'1D': 'orange', '2D': 'blue'}
+
+
+def load_figure_data(spec, columns, algorithms=('1D', '2D'), store=DEFAULT_STORE,
+                     exclusions=EXCLUSIONS_FILE):
+    """Rows of one figure: its campaign and dataset, from the store or the figure's CSV.
+
+    Runs listed in the exclusions file are dropped; the per-figure CSVs do
+    not identify runs, so exclusions only apply to the store.
+    """
+    campaign, fallback_csv = KINDS[spec["kind"]]
+    filters = [('campaign', '==', campaign), ('dataset', '==', spec["dataset"]),
+               ('algorithm', 'in', list(algorithms))]
+    df = load_results(
+        columns=columns + ['source', 'file'],
+        filters=filters,
+        fallback_csv=os.path.join(REPO_ROOT, spec["directory"], fallback_csv),
+        store=store)
+    df = drop_excluded(df, excluded_runs(exclusions))
+    return df.drop(columns=['source', 'file'], errors='ignore')
+
+
+def _log2_ticks(min_val, max_val, min_max_power=None):
+    # Powers of 2 covering [min_val, max_val]; labels are integers if >= 1,
+    # two decimals (e.g. 0.50, 0.25) if < 1
+    # Robust handling for NaN or non-positive min/max values on log scale
+    if np.isnan(min_val) or min_val <= 0:
+        min_val = 0.1
+    if np.isnan(max_val) or max_val <= 0:
+        max_val = 1000
+
+    min_power = int(np.floor(np.log2(min_val)))
+    max_power = int(np.ceil(np.log2(max_val)))
+    if min_max_power is not None:
+        max_power = max(max_power, min_max_power)
+
+    values = [2**i for i in range(min_power, max_power + 1)]
+    labels = [str(int(v)) if v >= 1 else f'{v:.2f}' for v in values]
+    return values, labels
+
+
+def plot_ci(grouped, x, xlabel, title, output, figsize, tick_fontsize=None,
+            legend_fontsize=None, min_max_power=None):
+    """Mean time with 95% CI error bars for 1D and 2D against x (figures 6 and 8)."""
+    # Filter out rows where the CI values are NaN (if any)
+    grouped = grouped.dropna(subset=['ci_lower', 'ci_upper'])
+    tick_kwargs = {} if tick_fontsize is None else {"fontsize": tick_fontsize}
+
+    plt.figure(figsize=figsize)
+
+    for algorithm in ['1D', '2D']:
+        subset = grouped[grouped['algorithm'] == algorithm]
+
+        # Calculate the error relative to the mean for error bars
+        # yerr is passed as [lower_errors, upper_errors]
+        y_error_lower = subset['mean'] - subset['ci_lower']
+        y_error_upper = subset['ci_upper'] - subset['mean']
+        y_error = [y_error_lower.values, y_error_upper.values]
+
+        # Plot the mean time using errorbar
+        plt.errorbar(
+            subset[x],
+            subset['mean'],
+            yerr=y_error,
+            marker='o',
+            label=f'Actor IMM {algorithm}',
+            linestyle='-',
+            color=COLORS[algorithm],
+            capsize=4,       # Size of the error bar caps
+            elinewidth=1.5   # Thickness of the error bar lines
+        )
+
+    # Set plot labels and title
+    plt.title(title, fontsize=26)
+    plt.xlabel(xlabel, fontsize=24)
+    plt.ylabel('Time (s)', fontsize=24)
+
+    # Use log scale for both axes, with base 2
+    plt.xscale('log', base=2)
+    plt.yscale('log', base=2)
+
+    # Adjust X-ticks to show the actual parameter values
+    unique_x = sorted(grouped[x].unique())
+    plt.xticks(unique_x, [str(v) for v in unique_x], **tick_kwargs)
+
+    # Determine appropriate powers of 2 for y-axis ticks
+    y_ticks_values, y_tick_labels = _log2_ticks(
+        grouped['ci_lower'].min(), grouped['ci_upper'].max(), min_max_power)
+    plt.yticks(y_ticks_values, y_tick_labels, **tick_kwargs)
+
+    plt.minorticks_off()  # Turn off minor ticks to avoid clutter
+
+    # Add grid and legend
+    plt.grid(True, which="major", ls="--", linewidth=0.5)
+    if legend_fontsize is None:
+        plt.legend()
+    else:
+        plt.legend(fontsize=legend_fontsize)
+
+    plt.savefig(output)
+    plt.close()
+
+
+def plot_scaling(df, spec, output):
+    """Figure 6: total time against core count."""
+    grouped = group_ci(df, ['cores', 'algorithm'], 'total_time', confidence=0.95)
+    plot_ci(grouped, 'cores', 'Cores', spec["title"], output, figsize=(8, 6))
+
+
+def plot_k(df, spec, output):
+    """Figure 8: total time against k (y axis reaches at least 2^8 = 256)."""
+    grouped = group_ci(df, ['k', 'algorithm'], 'total_time', confidence=0.95)
+    plot_ci(grouped, 'k', 'k', spec["title"], output, figsize=(10, 6),
+            tick_fontsize=18, legend_fontsize=16, min_max_power=8)
+
+
+def plot_eps(df, spec, output):
+    """Figure 10: total time against epsilon (single repetition per point)."""
+    df_sorted = df.dropna(subset=['total_time']).sort_values(by='eps')
+
+    plt.figure(figsize=(10, 6))
+
+    for algorithm in ['1D', '2D']:
+        subset = df_sorted[df_sorted['algorithm'] == algorithm]
+
+        # Plot the sorted points and connect them with a line
+        plt.plot(
+            subset['eps'],
+            subset['total_time'],
+            marker='o',
+            label=f'Actor IMM {algorithm}',
+            linestyle='-',
+            color=COLORS[algorithm]
+        )
+
+    plt.title(spec["title"], fontsize=26)
+    plt.xlabel('epsilon', fontsize=24)
+    plt.ylabel('Time (s)', fontsize=24)
+
+    # Use log scale for the y-axis, with ticks at powers of 2
+    plt.yscale('log')
+    y_ticks_values = [2**i for i in range(int(np.floor(np.log2(df_sorted['total_time'].min()))),
+                                          int(np.ceil(np.log2(df_sorted['total_time'].max()))) + 1)]
+    plt.yticks(y_ticks_values, [str(int(v)) for v in y_ticks_values], fontsize=18)
+
+    plt.legend(fontsize=18)
+    plt.xticks(fontsize=18)
+    plt.yticks(fontsize=18)
+
+    plt.grid(True, which="both", ls="--", linewidth=0.5)
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close()
+
+
+def plot_phases(df, spec, output):
+    """Figure 13: stacked matrixGen / k-loops time of 2D against core count."""
+    df = df.dropna(subset=['matrixGen_time', 'kloops_time'])
+
+    grouped = df.groupby('cores').agg(
+        mean_matrixGen_time=('matrixGen_time', 'mean'),
+        mean_kloops_time=('kloops_time', 'mean')
+    ).reset_index()
+
+    # Create equal spacing on x-axis
+    grouped['x_position'] = np.arange(1, len(grouped) + 1)
+
+    plt.figure(figsize=(9, 6))
+
+    # Stacked bars
+    plt.bar(grouped['x_position'], grouped['mean_matrixGen_time'],
+            label='Matrix Gen', color='black', width=0.75)
+
+    plt.bar(grouped['x_position'], grouped['mean_kloops_time'],
+            bottom=grouped['mean_matrixGen_time'],
+            label='k Loops', color='orange', width=0.75)
+
+    plt.xlabel("Cores", fontsize=24)
+    plt.ylabel("Time (sec)", fontsize=24)
+    plt.title(spec["title"], fontsize=26)
+
+    plt.yscale("log")
+
+    # ---- Major ticks only (powers of 2) ----
+    total_times = grouped['mean_matrixGen_time'] + grouped['mean_kloops_time']
+    min_exp = int(np.floor(np.log2(total_times.min())))
+    max_exp = int(np.ceil(np.log2(total_times.max())))
+    y_ticks = [2**e for e in range(min_exp, max_exp + 1)]
+    plt.yticks(y_ticks, [str(t) for t in y_ticks])
+
+    # ---- Major gridlines only ----
+    plt.grid(True, which='major', linestyle='--', linewidth=0.8)
+    plt.grid(False, which='minor')
+
+    # X-ticks with actual core counts
+    plt.xticks(grouped['x_position'], grouped['cores'].astype(str))
+
+    plt.tick_params(axis='both', labelsize=20)
+
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close()
+
+
+# kind -> (plot function, columns it reads, algorithms it shows)
+PLOTTERS = {
+    "scaling": (plot_scaling, ['cores', 'algorithm', 'total_time'], ('1D', '2D')),
+    "k": (plot_k, ['k', 'algorithm', 'total_time'], ('1D', '2D')),
+    "eps": (plot_eps, ['algorithm', 'eps', 'total_time'], ('1D', '2D')),
+    "phases": (plot_phases, ['cores', 'matrixGen_time', 'kloops_time'], ('2D',)),
+}
+
+# Sources whose changes alter the rendered figures
+CODE_FILES = [
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "stats.py"),
+]
+
+
+def figure_path(name):
+    spec = FIGURES[name]
+    return os.path.join(REPO_ROOT, spec["directory"], spec["output"])
+
+
+def hash_path(output):
+    """Sidecar holding the content hash of a rendered figure: .<name>.png.sha256"""
+    directory, filename = os.path.split(output)
+    return os.path.join(directory, f".{filename}.sha256")
+
+
+def figure_hash(df, spec):
+    """Hash of everything a figure depends on.
+
+    Covers the data slice (values and column names), the figure parameters,
+    the plotting code and the matplotlib version, so any change that could
+    alter the PNG gives a new hash.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(spec, sort_keys=True).encode())
+    digest.update(matplotlib.__version__.encode())
+    for path in CODE_FILES:
+        with open(path, 'rb') as source:
+            digest.update(source.read())
+    digest.update(",".join(df.columns).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_figure(name, store=DEFAULT_STORE, force=False, exclusions=EXCLUSIONS_FILE):
+    """Render one entry of FIGURES unless an up-to-date PNG already exists.
+
+    Returns (path of the PNG, True if it was rendered / False if the cached
+    output matched the content hash).
+    """
+    spec = FIGURES[name]
+    output = figure_path(name)
+    plot, columns, algorithms = PLOTTERS[spec["kind"]]
+    df = load_figure_data(spec, columns, algorithms, store=store, exclusions=exclusions)
+
+    digest = figure_hash(df, spec)
+    if not force and os.path.exists(output) and os.path.exists(hash_path(output)):
+        with open(hash_path(output)) as cached:
+            if cached.read().strip() == digest:
+                return output, False
+
+    plot(df, spec, output)
+    with open(hash_path(output), 'w') as cached:
+        cached.write(digest + "\n")
+    return output, True
+
+
+def render_all(names=None, workers=None, store=DEFAULT_STORE, force=False, exclusions=EXCLUSIONS_FILE):
+    """Render several figures in parallel worker processes.
+
+    Returns a list of (path, rendered) pairs like render_figure.
+    """
+    names = list(names or FIGURES)
+    render = partial(render_figure, store=store, force=force, exclusions=exclusions)
+    if workers == 1 or len(names) <= 1:
+        return [render(name) for name in names]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render, names))
+
+
+def check_exclusions(store=DEFAULT_STORE, exclusions=EXCLUSIONS_FILE):
+    """Warn about excluded runs that match no run of the store (and so exclude nothing)."""
+    run_ids = excluded_runs(exclusions)
+    if run_ids and pa is not None and os.path.exists(store):
+        warn_unmatched(read_store(store, columns=['source', 'file']), run_ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the reproducibility figures.")
+    parser.add_argument("names", nargs="*",
+                        help=f"figures to render (default: all): {', '.join(FIGURES)}")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--store", default=DEFAULT_STORE,
+                        help="results store; the per-figure CSVs are used if it does not exist or lacks a figure's rows")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="re-render even if the data and code are unchanged")
+    parser.add_argument("--exclusions", default=EXCLUSIONS_FILE,
+                        help="runs to leave out, as written by imm_tools.outliers --exclude")
+    parser.add_argument("--keep-outliers", action="store_true",
+                        help="also plot the runs listed in the exclusions file")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in FIGURES]
+    if unknown:
+        parser.error(f"unknown figure(s): {', '.join(unknown)}")
+
+    exclusions = None if args.keep_outliers else args.exclusions
+    check_exclusions(args.store, exclusions)
+    for path, rendered in render_all(args.names, workers=args.workers, store=args.store,
+                                     force=args.force, exclusions=exclusions):
+        print("Saved" if rendered else "Unchanged", os.path.relpath(path, REPO_ROOT))
+
+
+if __name__ == "__main__":
+    main()
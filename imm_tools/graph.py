@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+# Weighted graphs for the local LT model.
+#
+# Reads the *-LT.txt edge lists the run scripts pass to production /
+# production_2D ("u v w" per line, '#' comments, an optional "n m" header)
+# the way the binaries are invoked there: -u adds the reverse of every edge,
+# -w keeps the weights from the file (otherwise every in-edge of v weighs
+# 1/indegree(v)). As in the binaries' "Adjusting weights" step, the incoming
+# weights of a node are scaled down when they sum to more than 1, which LT
+# requires.
+#
+# The result is the reverse graph in CSR form: the in-neighbours of node v
+# are sources[offsets[v]:offsets[v + 1]] with the matching weights, which is
+# the direction reverse-reachable sets walk.
+#
+# Parsing a text edge list takes seconds, so load_graph keeps a binary copy
+# next to it (com-dblp.ungraph-LT.txt.csr/): offsets and sources as int32,
+# the normalized weights as float32, one .npy file each. Later loads map
+# these files read-only with np.load(mmap_mode='r'), which is near instant
+# and lets worker processes share the pages. The copy is rebuilt when the
+# edge list's size or mtime, or the -u/-w choice, changes.
+#
+# Usage (from the repository root, to build the binary copies up front):
+#   python -m imm_tools.graph /scratch/ipopa/repro/imm_hclib/input_files/*-LT.txt
+
+CSR_SUFFIX = ".csr"
+CSR_VERSION = 1
+CSR_ARRAYS = ["offsets", "sources", "weights"]
+
+
+class ReverseGraph:
+    """In-neighbour CSR arrays of a weighted directed graph."""
+
+    def __init__(self, offsets, sources, weights):
+        self.offsets = offsets
+        self.sources = sources
+        self.weights = weights
+
+    @property
+    def num_nodes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.sources)
+
+    def in_degree(self):
+        return np.diff(self.offsets)
+
+
+def _read_edges(path):
+    """Source, target and (possibly empty) weight columns of an edge list."""
+    import pandas as pd
+
+    # Skip an "n m" header line: it has fewer columns than the edges below
+    data_lines = []
+    with open(path) as file:
+        for number, line in enumerate(file):
+            tokens = line.split()
+            if tokens and not tokens[0].startswith('#'):
+                data_lines.append((number, len(tokens)))
+                if len(data_lines) == 2:
+                    break
+    skip = None
+    if len(data_lines) == 2 and data_lines[0][1] < data_lines[1][1]:
+        skip = [data_lines[0][0]]
+
+    table = pd.read_csv(path, sep=r"\s+", comment='#', header=None, skiprows=skip,
+                        engine='c').to_numpy()
+    sources = table[:, 0].astype(np.int64)
+    targets = table[:, 1].astype(np.int64)
+    weights = table[:, 2].astype(np.float64) if table.shape[1] > 2 else None
+    return sources, targets, weights
+
+
+def build_reverse_graph(sources, targets, weights=None, num_nodes=None, undirected=True):
+    """Reverse CSR graph from edge arrays, with LT-normalized weights.
+
+    weights=None assigns 1/indegree. Node ids are used as given, so the graph
+    has max(id) + 1 nodes unless num_nodes is larger.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)
+    if undirected:
+        sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+        if weights is not None:
+            weights = np.concatenate([weights, weights])
+
+    n = int(max(sources.max(initial=-1), targets.max(initial=-1)) + 1)
+    n = max(n, num_nodes or 0)
+    order = np.argsort(targets, kind='stable')
+    sources, targets = sources[order], targets[order]
+    in_degree = np.bincount(targets, minlength=n)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(in_degree, out=offsets[1:])
+
+    if weights is None:
+        weights = 1.0 / in_degree[targets]
+    else:
+        weights = weights[order]
+        totals = np.bincount(targets, weights=weights, minlength=n)
+        weights = weights / np.maximum(totals, 1.0)[targets]
+
+    return ReverseGraph(offsets, sources.astype(np.int32), weights.astype(np.float32))
+
+
+def parse_graph(path, undirected=True, weighted=True):
+    """Reverse CSR graph of a *-LT.txt edge list, read like `-u -w` does."""
+    sources, targets, weights = _read_edges(path)
+    return build_reverse_graph(sources, targets, weights if weighted else None,
+                               undirected=undirected)
+
+
+def csr_path(path):
+    """Directory of the binary copy of an edge list."""
+    return path + CSR_SUFFIX
+
+
+def _csr_meta(path, undirected, weighted):
+    stat = os.stat(path)
+    return {
+        "version": CSR_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "undirected": undirected,
+        "weighted": weighted,
+    }
+
+
+def write_csr(graph, directory, meta):
+    """Write the CSR arrays as .npy files and meta.json into a fresh directory.
+
+    The copy is built in a temporary sibling directory and renamed into
+    place, so a reader never sees a half-written copy and processes that
+    still map the old files keep their (now unlinked) pages.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    staging = tempfile.mkdtemp(prefix=os.path.basename(directory) + ".", dir=parent)
+    try:
+        # int32 indices while they fit, as production does
+        index_type = np.int32 if graph.num_edges < 2 ** 31 else np.int64
+        arrays = {
+            "offsets": graph.offsets.astype(index_type),
+            "sources": graph.sources.astype(np.int32),
+            "weights": graph.weights.astype(np.float32),
+        }
+        for name in CSR_ARRAYS:
+            np.save(os.path.join(staging, name + ".npy"), arrays[name])
+        with open(os.path.join(staging, "meta.json"), 'w') as file:
+            json.dump(meta, file)
+        # mkdtemp creates the directory as 0700; give the cache the mode a
+        # plain mkdir would, so other users of a shared checkout can read it
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(staging, 0o777 & ~umask)
+
+        # os.replace cannot overwrite a non-empty directory: move the old copy
+        # aside first (its mapped files stay valid) and drop it afterwards
+        retired = None
+        if os.path.exists(directory):
+            retired = tempfile.mkdtemp(prefix=os.path.basename(directory) + ".old.", dir=parent)
+            os.replace(directory, os.path.join(retired, "csr"))
+        os.replace(staging, directory)
+        if retired is not None:
+            shutil.rmtree(retired, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def read_csr(directory):
+    """Memory-map the arrays of a binary copy (read-only)."""
+    arrays = [np.load(os.path.join(directory, name + ".npy"), mmap_mode='r') for name in CSR_ARRAYS]
+    return ReverseGraph(*arrays)
+
+
+def _csr_current(directory, meta):
+    try:
+        with open(os.path.join(directory, "meta.json")) as file:
+            return json.load(file) == meta
+    except (OSError, ValueError):
+        return False
+
+
+def load_graph(path, undirected=True, weighted=True, use_cache=True):
+    """Reverse CSR graph of an edge list, through its binary copy when use_cache is set.
+
+    A missing or outdated copy is rebuilt from the text file; if it cannot be
+    written (read-only input directory) the parsed graph is returned as is.
+    """
+    if not use_cache:
+        return parse_graph(path, undirected, weighted)
+
+    directory = csr_path(path)
+    meta = _csr_meta(path, undirected, weighted)
+    if not _csr_current(directory, meta):
+        graph = parse_graph(path, undirected, weighted)
+        try:
+            write_csr(graph, directory, meta)
+        except OSError:
+            return graph
+    return read_csr(directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert *-LT.txt edge lists to memory-mappable CSR copies.")
+    parser.add_argument("inputs", nargs="+", help="edge list files")
+    parser.add_argument("--directed", action="store_true", help="do not add reverse edges (no -u)")
+    parser.add_argument("--unweighted", action="store_true", help="use 1/indegree weights (no -w)")
+    parser.add_argument("-f", "--force", action="store_true", help="rebuild copies that are up to date")
+    args = parser.parse_args(argv)
+
+    undirected, weighted = not args.directed, not args.unweighted
+    for path in args.inputs:
+        start = time.perf_counter()
+        graph = parse_graph(path, undirected, weighted)
+        parsed = time.perf_counter() - start
+        meta = _csr_meta(path, undirected, weighted)
+        if args.force or not _csr_current(csr_path(path), meta):
+            write_csr(graph, csr_path(path), meta)
+
+        start = time.perf_counter()
+        read_csr(csr_path(path))
+        mapped = time.perf_counter() - start
+        print(f"{path}: {graph.num_nodes} nodes, {graph.num_edges} edges, "
+              f"text {parsed:.3f} s, binary {mapped * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from imm_tools.cache import open_cache
+from imm_tools.logparse import RUN_FIELDS, parse_log
+from imm_tools.store import DEFAULT_STORE, repo_path, write_store
+
+# Parallel ingestion of whole results trees.
+#
+# Usage (from the repository root):
+#   python -m imm_tools.ingest figure8 figure10 "figures6&13" -o results.parquet
+#
+# Every directory given on the command line is walked recursively for
+# log_*.txt files. The file list is cut into chunks and each chunk is parsed
+# by one worker of a process pool; the per-chunk rows are merged into a
+# single table with a "source" column naming the results directory
+# (relative to the repository root, however the root was given).
+# Unchanged logs are served from the per-directory parse cache (see
+# imm_tools.cache) unless --no-cache is given. A .parquet output is written
+# as the typed columnar store read by the plot scripts (imm_tools.store),
+# anything else as CSV.
+
+TABLE_FIELDS = ["source"] + RUN_FIELDS
+
+# Files per work unit: large enough to amortise the pickling round trip,
+# small enough to keep all workers busy at the tail of the list
+DEFAULT_CHUNKSIZE = 64
+
+
+def find_logs(roots):
+    """All log_*.txt files below the given directories, sorted by path."""
+    paths = []
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.startswith("log_") and filename.endswith(".txt"):
+                    paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+def parse_chunk(paths, use_mmap=None):
+    """Parse a list of logs in one worker and return their (run, rounds) pairs."""
+    return [parse_log(path, use_mmap) for path in paths]
+
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def parse_paths(paths, workers=None, chunksize=DEFAULT_CHUNKSIZE, use_mmap=None):
+    """parse_log over paths on a process pool, results in input order."""
+    chunks = chunked(paths, chunksize)
+    parse = partial(parse_chunk, use_mmap=use_mmap)
+    parsed = []
+
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            parsed.extend(parse(chunk))
+        return parsed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map preserves chunk order, so results line up with paths
+        for chunk_parsed in pool.map(parse, chunks):
+            parsed.extend(chunk_parsed)
+    return parsed
+
+
+def ingest_runs(roots, workers=None, chunksize=DEFAULT_CHUNKSIZE, use_cache=True, use_mmap=None):
+    """Parse every log below roots across a process pool.
+
+    Returns a list of (path, run, rounds) tuples in path order. With
+    use_cache, each results directory keeps a ParseCache sidecar and only new
+    or modified logs are sent to the pool; directories whose cache cannot be
+    written are parsed in full. workers=1 parses in the calling
+    process, which is handy for debugging. use_mmap is passed on to parse_log.
+    """
+    paths = find_logs(roots)
+    results = {}
+    caches = {}
+
+    if use_cache:
+        by_dir = {}
+        for path in paths:
+            by_dir.setdefault(os.path.dirname(path), []).append(path)
+        for log_dir, dir_paths in by_dir.items():
+            cache = open_cache(log_dir)
+            if cache is None:
+                continue
+            caches[log_dir] = cache
+            for path in dir_paths:
+                hit = cache.lookup(path)
+                if hit is not None:
+                    results[path] = hit
+            cache.evict_missing(dir_paths)
+            # Do not hold the write lock while the pool parses
+            cache.commit()
+
+    try:
+        stale = [path for path in paths if path not in results]
+        for path, result in zip(stale, parse_paths(stale, workers, chunksize, use_mmap)):
+            results[path] = result
+            cache = caches.get(os.path.dirname(path))
+            if cache is not None:
+                cache.store(path, *result)
+    finally:
+        for cache in caches.values():
+            cache.close()
+
+    parsed = []
+    for path in paths:
+        run, rounds = results[path]
+        run["source"] = repo_path(os.path.dirname(path))
+        parsed.append((path, run, rounds))
+    return parsed
+
+
+def ingest(roots, workers=None, chunksize=DEFAULT_CHUNKSIZE, use_cache=True, use_mmap=None):
+    """Run-level table of every log below roots: row dicts keyed by TABLE_FIELDS."""
+    return [run for _, run, _ in ingest_runs(roots, workers, chunksize, use_cache, use_mmap)]
+
+
+def write_csv(rows, output_file, fields=TABLE_FIELDS):
+    with open(output_file, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse IMM logs from one or more results trees into one table.")
+    parser.add_argument("roots", nargs="+", help="directories to search for log_*.txt files")
+    parser.add_argument("-o", "--output", default=DEFAULT_STORE,
+                        help="output file; .parquet writes the results store, anything else CSV")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="log files per work unit")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="reparse every log instead of using the .parse_cache.sqlite sidecars")
+    parser.add_argument("--mmap", action="store_true",
+                        help="scan every log through mmap (default: only logs above 64 MiB)")
+    args = parser.parse_args(argv)
+
+    rows = ingest(args.roots, workers=args.workers, chunksize=args.chunksize,
+                  use_cache=not args.no_cache, use_mmap=True if args.mmap else None)
+    if args.output.endswith(".parquet"):
+        write_store(rows, args.output)
+    else:
+        write_csv(rows, args.output)
+    print(f"Parsed {len(rows)} logs into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
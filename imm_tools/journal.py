@@ -0,0 +1,90 @@
+import json
+import os
+import time
+
+# Completion journal of a sweep.
+#
+# Every finished run appends one JSON line to .sweep_journal.jsonl inside the
+# results directory (e.g. figure8/DBLP/results/.sweep_journal.jsonl), so
+# sibling output directories never share entries. A run counts as done when
+# it exited with 0 and its log reached the final "Total Time:" line; a
+# relaunched sweep skips done runs and only starts the missing or failed
+# ones, so an allocation that runs out halfway loses just the runs in flight.
+
+JOURNAL_FILE = ".sweep_journal.jsonl"
+
+CELL_FIELDS = ["name", "dataset", "algorithm", "cores", "nodes", "k", "eps", "rep"]
+
+
+def journal_path(output_dir):
+    """Location of the journal for a results directory."""
+    return os.path.join(os.path.abspath(output_dir), JOURNAL_FILE)
+
+
+def log_complete(path):
+    """True if the log exists and contains the final "Total Time:" line."""
+    try:
+        with open(path, 'r', errors='replace') as file:
+            return any(line.strip().startswith("Total Time:") for line in file)
+    except FileNotFoundError:
+        return False
+
+
+class Journal:
+    """Append-only record of the runs of one results directory."""
+
+    def __init__(self, output_dir, path=None):
+        self.output_dir = output_dir
+        self.path = path or journal_path(output_dir)
+
+    def entries(self):
+        """Latest journal entry of every run name."""
+        latest = {}
+        if not os.path.exists(self.path):
+            return latest
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line of a job killed mid-write
+                    continue
+                latest[entry["name"]] = entry
+        return latest
+
+    def record(self, cell, returncode, complete):
+        entry = {field: cell.get(field) for field in CELL_FIELDS}
+        entry.update({
+            "returncode": returncode,
+            "complete": complete,
+            "status": "done" if returncode == 0 and complete else "failed",
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(entry) + "\n")
+        return entry
+
+    def log_path(self, cell):
+        return os.path.join(self.output_dir, f"log_{cell['name']}.txt")
+
+    def pending(self, cells, adopt=True):
+        """Cells still to run: not journaled as done, or whose log is no longer complete.
+
+        Complete logs without a journal entry (e.g. written by the old run
+        scripts) are not rerun; with adopt they are journaled as done.
+        """
+        entries = self.entries()
+        pending = []
+        for cell in cells:
+            entry = entries.get(cell["name"])
+            complete = log_complete(self.log_path(cell))
+            if complete and entry is None:
+                if adopt:
+                    self.record(cell, 0, True)
+            elif not complete or entry["status"] != "done":
+                pending.append(cell)
+        return pending
+
+    def finish(self, cell, returncode):
+        """Validate a finished run's log and journal the outcome."""
+        return self.record(cell, returncode, log_complete(self.log_path(cell)))
@@ -0,0 +1,285 @@
+import heapq
+import mmap
+import os
+import re
+
+# Streaming parser for the log_*.txt files written by lt_1D/production and
+# lt_2D/production_2D.
+#
+# Every log is read exactly once, line by line, and all metrics the figure
+# scripts need (graph header, per-round sampling trace, final phase timings
+# and totals) are collected in that single pass. Lines are dispatched on
+# fixed prefixes with str.startswith, so no regex runs over the log body.
+#
+# Very large logs (verbose production/production_2D output at high rank
+# counts) take the memory-mapped fast path instead: the file is mmap'ed and
+# only the lines starting with one of METRIC_PREFIXES are located with
+# bytes.find and decoded, so the rest of the log is never copied into Python.
+
+# Run names used by the three campaigns:
+#   figures6&13: log_1n_48c_2D_r1.txt      (nodes, cores, algorithm, rep)
+#   figure8:     log_k128_1D_r3.txt        (k, algorithm, rep)
+#   figure10:    log_k100_2D_e0.3_r1.txt   (k, algorithm, epsilon, rep)
+SCALING_RE = re.compile(r'(?:log|inf|time)_(\d+)n_(\d+)c_(\d)D_r(\d+)\.txt$')
+KSCALING_RE = re.compile(r'(?:log|inf|time)_k(\d+)_(\d)D_r(\d+)\.txt$')
+EPS_RE = re.compile(r'(?:log|inf|time)_k(\d+)_(\d)D_e([0-9.]+)_r(\d+)\.txt$')
+
+APPLICATION_RE = re.compile(
+    r'Number of influencers:\s*(\d+),\s*epsilon\s*=\s*([0-9.]+).*,\s*file:\s*(\S+)')
+
+# Line prefixes of every metric parse_lines understands (as bytes, for the mmap scan)
+METRIC_PREFIXES = [
+    b"Application:", b"Total Number of", b"Graph Info:", b"Delta/PE:",
+    b"[ESTIMATE]", b"[Time until now]", b"Fraction covered:", b"ThetaFinal/PE:",
+    b"Final, Time taken", b"Time taken to select", b"#RRsets total/pe:", b"Total Time",
+]
+
+# Logs at least this large are parsed through mmap by default
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Run-level fields in the order they are written to tables
+RUN_FIELDS = [
+    "file", "campaign", "dataset", "algorithm", "nodes", "cores", "k", "eps",
+    "repetition", "graph_nodes", "graph_edges", "avg_degree", "max_degree",
+    "rounds", "theta_final_pe", "rrsets_total_pe", "final_generateRR_time",
+    "final_selectseeds_time", "coverage", "matrixGen_time", "kloops_time",
+    "total_time", "generateRR_time", "selectseeds_time",
+]
+
+# Per-round fields of the STEP 1 sampling trace
+ROUND_FIELDS = [
+    "round", "delta_pe", "rr_time", "select_time", "matrixGen_time",
+    "kloops_time", "coverage",
+]
+
+
+def parse_filename(filename):
+    """Return the run parameters encoded in a log/inf/time file name, or None."""
+    name = os.path.basename(filename)
+
+    match = SCALING_RE.match(name)
+    if match:
+        return {
+            "campaign": "scaling",
+            "nodes": int(match.group(1)),
+            "cores": int(match.group(2)),
+            "algorithm": f"{match.group(3)}D",
+            "k": None,
+            "eps": None,
+            "repetition": int(match.group(4)),
+        }
+
+    match = EPS_RE.match(name)
+    if match:
+        return {
+            "campaign": "eps",
+            "nodes": None,
+            "cores": None,
+            "algorithm": f"{match.group(2)}D",
+            "k": int(match.group(1)),
+            "eps": float(match.group(3)),
+            "repetition": int(match.group(4)),
+        }
+
+    match = KSCALING_RE.match(name)
+    if match:
+        return {
+            "campaign": "k",
+            "nodes": None,
+            "cores": None,
+            "algorithm": f"{match.group(2)}D",
+            "k": int(match.group(1)),
+            "eps": None,
+            "repetition": int(match.group(3)),
+        }
+
+    return None
+
+
+def dataset_name(input_file):
+    """Short dataset name from the graph path, e.g. com-dblp.ungraph-LT.txt -> com-dblp."""
+    name = os.path.basename(input_file)
+    for suffix in (".txt", "-LT", ".ungraph"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+
+def _value(line):
+    # "<label>:    0.015 seconds" -> 0.015
+    return float(line.rsplit(":", 1)[1].split()[0])
+
+
+def _new_round(index, delta_pe):
+    return {
+        "round": index,
+        "delta_pe": delta_pe,
+        "rr_time": None,
+        "select_time": None,
+        "matrixGen_time": None,
+        "kloops_time": None,
+        "coverage": None,
+    }
+
+
+class LogParser:
+    """State of parse_lines kept between calls, for logs that are still being written."""
+
+    def __init__(self):
+        self.run = dict.fromkeys(RUN_FIELDS)
+        self.rounds = []
+        self._current = None
+        self._final = False
+
+    def feed(self, lines):
+        """Parse more lines of the log; returns (run, rounds) so far."""
+        for line in lines:
+            try:
+                self._current, self._final = _parse_line(
+                    line, self.run, self.rounds, self._current, self._final)
+            except (ValueError, IndexError):
+                # Truncated or garbled line, e.g. a run killed mid-write
+                continue
+        self.run["rounds"] = len(self.rounds)
+        return self.run, self.rounds
+
+
+def parse_lines(lines):
+    """Parse an iterable of log lines into a (run, rounds) pair.
+
+    run is a dict keyed by RUN_FIELDS (file-name fields are left as None),
+    rounds is a list of dicts keyed by ROUND_FIELDS, one per Delta/PE block of
+    the sampling phase. Missing metrics are None, e.g. for crashed runs.
+    """
+    return LogParser().feed(lines)
+
+
+def _parse_line(line, run, rounds, current, final):
+    # Dispatch one log line on its prefix; returns the updated (current, final)
+    if line.startswith("Delta/PE:"):
+        current = _new_round(len(rounds) + 1, int(_value(line)))
+        rounds.append(current)
+    elif line.startswith("[ESTIMATE]Time taken to generate RR sets"):
+        if current is not None:
+            current["rr_time"] = _value(line)
+    elif line.startswith("[ESTIMATE]Time taken to select seeds"):
+        if current is not None:
+            current["select_time"] = _value(line)
+    elif line.startswith("[Time until now] in matrixGen:"):
+        # The last value in the file is the cumulative total (final phase)
+        run["matrixGen_time"] = _value(line)
+        if current is not None and not final:
+            current["matrixGen_time"] = run["matrixGen_time"]
+    elif line.startswith("[Time until now] in k loops:"):
+        run["kloops_time"] = _value(line)
+        if current is not None and not final:
+            current["kloops_time"] = run["kloops_time"]
+    elif line.startswith("Fraction covered:"):
+        run["coverage"] = _value(line)
+        if current is not None and not final:
+            current["coverage"] = run["coverage"]
+    elif line.startswith("Total Time:"):
+        run["total_time"] = _value(line)
+    elif line.startswith("Total Time(generateRR):"):
+        run["generateRR_time"] = _value(line)
+    elif line.startswith("Total Time(selectseeds):"):
+        run["selectseeds_time"] = _value(line)
+    elif line.startswith("ThetaFinal/PE:"):
+        final = True
+        run["theta_final_pe"] = int(_value(line))
+    elif line.startswith(("Final, Time taken to generate RR sets:",
+                          "Time taken to select generate RRR sets:")):
+        # 2D and 1D spell the final RR generation line differently
+        run["final_generateRR_time"] = _value(line)
+    elif line.startswith(("Final, Time taken to select seeds:",
+                          "Time taken to select seeds:")):
+        run["final_selectseeds_time"] = _value(line)
+    elif line.startswith("#RRsets total/pe:"):
+        run["rrsets_total_pe"] = int(_value(line))
+    elif line.startswith("Total Number of Nodes in G:"):
+        run["graph_nodes"] = int(_value(line))
+    elif line.startswith("Total Number of Edges in G:"):
+        run["graph_edges"] = int(_value(line))
+    elif line.startswith("Graph Info: AVG-degree:"):
+        run["avg_degree"] = _value(line)
+    elif line.startswith("Graph Info: Max-degree:"):
+        run["max_degree"] = int(_value(line))
+    elif line.startswith("Application:"):
+        match = APPLICATION_RE.search(line)
+        if match:
+            run["k"] = int(match.group(1))
+            run["eps"] = float(match.group(2))
+            run["dataset"] = dataset_name(match.group(3))
+
+    return current, final
+
+
+def _prefix_positions(mm, prefix):
+    # Offsets of the lines of mm that start with prefix, in increasing order
+    pos = mm.find(prefix)
+    while pos != -1:
+        if pos == 0 or mm[pos - 1] == 0x0A:
+            yield pos
+        pos = mm.find(prefix, pos + 1)
+
+
+def mmap_lines(mm):
+    """Yield, in file order, the decoded lines of mm that carry a metric.
+
+    One bytes.find scan per prefix runs in C; heapq.merge interleaves them
+    lazily, so memory stays flat regardless of the log size.
+    """
+    scans = [_prefix_positions(mm, prefix) for prefix in METRIC_PREFIXES]
+    for pos in heapq.merge(*scans):
+        end = mm.find(b"\n", pos)
+        if end == -1:
+            end = len(mm)
+        yield mm[pos:end].decode(errors='replace')
+
+
+def parse_log(path, use_mmap=None):
+    """Parse one log file in a single streaming pass.
+
+    Returns (run, rounds) like parse_lines, with the parameters encoded in the
+    file name (campaign, nodes, cores, algorithm, k, eps, repetition) merged
+    into run. Values from the file name win over the log header.
+
+    use_mmap selects the memory-mapped prefix scan (True) or the line-by-line
+    reader (False); by default the scan is used from MMAP_THRESHOLD bytes on.
+    """
+    if use_mmap is None:
+        use_mmap = os.path.getsize(path) >= MMAP_THRESHOLD
+
+    if use_mmap:
+        with open(path, 'rb') as log_file:
+            if os.fstat(log_file.fileno()).st_size == 0:
+                # mmap cannot map an empty file
+                run, rounds = parse_lines([])
+            else:
+                with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    run, rounds = parse_lines(mmap_lines(mm))
+    else:
+        with open(path, 'r', errors='replace') as log_file:
+            run, rounds = parse_lines(log_file)
+
+    return merge_filename(run, path), rounds
+
+
+def merge_filename(run, path):
+    """Add the file name and the parameters encoded in it to a parsed run."""
+    run["file"] = os.path.basename(path)
+    params = parse_filename(path)
+    if params:
+        for key, value in params.items():
+            if value is not None or run.get(key) is None:
+                run[key] = value
+    return run
+
+
+def list_logs(log_dir):
+    """Sorted paths of the log_*.txt files in a results directory."""
+    return [
+        os.path.join(log_dir, filename)
+        for filename in sorted(os.listdir(log_dir))
+        if filename.startswith("log_") and filename.endswith(".txt")
+    ]
@@ -0,0 +1,183 @@
+import argparse
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from imm_tools.graph import load_graph
+from imm_tools.ingest import write_csv
+from imm_tools.rrsets import DEFAULT_BATCH, generate_rr_sets
+
+# Simulator of the 2D-partitioned seed selection of production_2D.
+#
+# Usage (from the repository root):
+#   python -m imm_tools.matrix2d input_files/com-dblp.ungraph-LT.txt -k 100 -n 200000 \
+#       --grid 1x32 2x16 4x8 8x4 --blocks blocks.csv
+#
+# Seed selection works on the node x RR-set incidence matrix. On a pr x pc
+# process grid, node v goes to process row v % pr and RR set s to process
+# column s % pc (cyclic, as in the logs' "Cyclic Mapping"), and every
+# process holds its block as a sparse matrix; building the blocks is the
+# matrixGen phase. Each of the k loops then
+#   1. counts the uncovered RR sets of every local node (block @ uncovered),
+#   2. sums the counts along the process row (allreduce of one value per
+#      node of the row),
+#   3. finds the best node over the process column (allreduce of a
+#      (gain, node) pair), and
+#   4. sends the RR sets newly covered by that node down each process
+#      column, so every block can update its uncovered mask.
+# The blocks are simulated in one process; communication is not timed but
+# counted in bytes, with ring allreduces sending 2 (p - 1) / p of the vector
+# per process.
+
+BLOCK_FIELDS = ["grid", "row", "col", "nodes", "rr_sets", "nnz", "memory_bytes"]
+
+SUMMARY_FIELDS = [
+    "grid", "pr", "pc", "matrixGen_time", "kloops_time", "max_block_bytes", "nnz_imbalance",
+    "row_reduce_bytes", "argmax_bytes", "cover_bcast_bytes", "total_comm_bytes", "coverage",
+]
+
+INDEX_BYTES = 4
+COUNT_BYTES = 4
+
+
+def parse_grid(text):
+    """'4x8' -> (4, 8)."""
+    pr, pc = text.lower().split("x")
+    return int(pr), int(pc)
+
+
+def block_memory(block):
+    """Bytes of a CSR block: int32 column indices and row pointers (the values are implicit ones)."""
+    return INDEX_BYTES * (block.nnz + block.shape[0] + 1)
+
+
+def build_blocks(offsets, nodes, num_nodes, pr, pc):
+    """The matrixGen step: one CSR incidence block per process of a pr x pc grid.
+
+    Returns a pr x pc nested list of scipy.sparse.csr_matrix; block (i, j)
+    has local row v // pr for node v and local column s // pc for RR set s.
+    """
+    num_sets = len(offsets) - 1
+    sets = np.repeat(np.arange(num_sets, dtype=np.int64), np.diff(offsets))
+    row_part, col_part = nodes % pr, sets % pc
+    order = np.argsort(row_part * pc + col_part, kind='stable')
+    bounds = np.searchsorted((row_part * pc + col_part)[order], np.arange(pr * pc + 1))
+
+    blocks = []
+    for i in range(pr):
+        block_row = []
+        rows = (num_nodes - i + pr - 1) // pr
+        for j in range(pc):
+            entries = order[bounds[i * pc + j]:bounds[i * pc + j + 1]]
+            cols = (num_sets - j + pc - 1) // pc
+            block = sp.csr_matrix(
+                (np.ones(len(entries), dtype=np.int32), (nodes[entries] // pr, sets[entries] // pc)),
+                shape=(rows, cols))
+            block_row.append(block)
+        blocks.append(block_row)
+    return blocks
+
+
+def select_2d(blocks, num_sets, k):
+    """Run the k loops over the blocks; returns (seeds, coverage, communication bytes by kind)."""
+    pr, pc = len(blocks), len(blocks[0])
+    uncovered = [np.ones(blocks[0][j].shape[1], dtype=np.int32) for j in range(pc)]
+    ring = 2 * (pc - 1) / pc if pc > 1 else 0.0
+    volume = {"row_reduce_bytes": 0.0, "argmax_bytes": 0.0, "cover_bcast_bytes": 0.0}
+
+    seeds = []
+    covered = 0
+    for _ in range(k):
+        best_gain, best_node = 0, -1
+        for i in range(pr):
+            # Local counts, then the allreduce along process row i
+            gains = sum(blocks[i][j] @ uncovered[j] for j in range(pc))
+            volume["row_reduce_bytes"] += pc * ring * COUNT_BYTES * len(gains)
+            if not len(gains) or gains.max() == 0:
+                continue
+            # Same tie rule as greedy: the smallest node id wins
+            gain, node = int(gains.max()), int(gains.argmax()) * pr + i
+            if gain > best_gain or (gain == best_gain and node < best_node):
+                best_gain, best_node = gain, node
+        volume["argmax_bytes"] += pc * pr * np.ceil(np.log2(pr)) * 2 * COUNT_BYTES
+        if best_gain == 0:
+            break
+
+        i, local = best_node % pr, best_node // pr
+        for j in range(pc):
+            row = blocks[i][j].indices[blocks[i][j].indptr[local]:blocks[i][j].indptr[local + 1]]
+            newly = row[uncovered[j][row] == 1]
+            uncovered[j][newly] = 0
+            volume["cover_bcast_bytes"] += (pr - 1) * INDEX_BYTES * len(newly)
+        seeds.append(best_node)
+        covered += best_gain
+
+    return seeds, covered / num_sets if num_sets else 0.0, volume
+
+
+def simulate(offsets, nodes, num_nodes, pr, pc, k):
+    """Build the blocks of a pr x pc grid and run selection; returns (summary, block rows)."""
+    grid = f"{pr}x{pc}"
+    start = time.perf_counter()
+    blocks = build_blocks(offsets, nodes, num_nodes, pr, pc)
+    matrix_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    seeds, coverage, volume = select_2d(blocks, len(offsets) - 1, k)
+    kloops_time = time.perf_counter() - start
+
+    block_rows = [
+        {"grid": grid, "row": i, "col": j, "nodes": block.shape[0], "rr_sets": block.shape[1],
+         "nnz": block.nnz, "memory_bytes": block_memory(block)}
+        for i, block_row in enumerate(blocks) for j, block in enumerate(block_row)
+    ]
+    nnz = np.array([row["nnz"] for row in block_rows])
+    summary = {
+        "grid": grid,
+        "pr": pr,
+        "pc": pc,
+        "matrixGen_time": round(matrix_time, 6),
+        "kloops_time": round(kloops_time, 6),
+        "max_block_bytes": max(row["memory_bytes"] for row in block_rows),
+        "nnz_imbalance": round(float(nnz.max() / nnz.mean()), 4) if nnz.sum() else None,
+        "total_comm_bytes": int(sum(volume.values())),
+        "coverage": round(coverage, 6),
+    }
+    summary.update({key: int(value) for key, value in volume.items()})
+    summary["seeds"] = seeds
+    return summary, block_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate 2D-partitioned seed selection on process grid shapes.")
+    parser.add_argument("graph", help="*-LT.txt edge list")
+    parser.add_argument("-k", type=int, default=100, help="number of seeds")
+    parser.add_argument("-n", "--count", type=int, default=100000, help="number of RR sets")
+    parser.add_argument("--grid", nargs="+", default=["1x4", "2x2", "4x1"], help="process grids as ROWSxCOLS")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="RR sets per vectorized batch")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-o", "--output", default="matrix2d.csv", help="per-grid summary CSV")
+    parser.add_argument("--blocks", help="also write per-block nodes, RR sets, nnz and memory to this CSV")
+    args = parser.parse_args(argv)
+
+    graph = load_graph(args.graph)
+    offsets, nodes = generate_rr_sets(graph, args.count, np.random.default_rng(args.seed), args.batch)
+
+    summaries, blocks = [], []
+    for text in args.grid:
+        summary, block_rows = simulate(offsets, nodes, graph.num_nodes, *parse_grid(text), args.k)
+        summaries.append(summary)
+        blocks.extend(block_rows)
+        print(f"{summary['grid']:>7}: matrixGen {summary['matrixGen_time']:8.3f} s, "
+              f"k loops {summary['kloops_time']:8.3f} s, "
+              f"max block {summary['max_block_bytes'] / 2 ** 20:8.2f} MiB, "
+              f"communication {summary['total_comm_bytes'] / 2 ** 20:10.2f} MiB")
+
+    write_csv(summaries, args.output, fields=SUMMARY_FIELDS)
+    if args.blocks:
+        write_csv(blocks, args.blocks, fields=BLOCK_FIELDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+
+from imm_tools.ingest import find_logs
+from imm_tools.journal import Journal
+from imm_tools.logparse import LogParser, merge_filename
+from imm_tools.sweep import PRESETS, expand, load_sweep
+
+# Live progress of the runs of a sweep, from their growing log_*.txt files.
+#
+# Usage (from the repository root, next to a running sweep):
+#   python -m imm_tools.monitor "figures6&13/com-DBLP/results"
+#   python -m imm_tools.monitor --sweep scaling_dblp --interval 30
+#
+# Every poll lists the log files (directory metadata only) and stats the
+# ones still running; a log that grew is read from its stored offset to its
+# new size, so each byte is read once and finished logs are never read
+# again. Polling is used rather than inotify, which does not see writes made
+# by other nodes on a shared filesystem.
+#
+# A run's progress is its sampling round (one per Delta/PE line). The
+# binaries stop sampling at the first round i whose coverage has
+# 2^i * coverage >= 1 (the seed set covers at least the x = n / 2^i the round
+# was sized for; this holds for every committed log). Coverage barely moves
+# after the first rounds, so the latest "Fraction covered" estimates the
+# number of rounds. The estimate can be a round short when coverage sits
+# right at a power of two (2 of the 323 committed logs), so it never goes
+# below the rounds already seen and progress stays at most 100%. From round
+# 2 on Delta/PE doubles every round. A round costs a fixed overhead plus a
+# time per RR set, fitted over the finished rounds, which projects the
+# remaining ones. The final RR generation and selection take a multiple of
+# the last round's time, measured on the finished logs seen so far.
+#
+# A log that stops growing for --stall-after seconds without reaching
+# "Total Time", or that the sweep journal records as failed, belongs to a
+# killed or failed run: it is shown as stalled or failed and left out of the
+# estimates. The sweep estimate adds the expected times of runs not started
+# yet (the mean of finished runs of the same configuration) and divides the
+# remaining work by the number of runs still running.
+
+DEFAULT_INTERVAL = 10.0
+
+# Final phase time over last sampling round time when no log has finished yet
+DEFAULT_FINAL_FACTOR = 1.0
+
+# Seconds without log output after which an unfinished run counts as stalled
+DEFAULT_STALL_AFTER = 3600.0
+
+
+class TailedLog:
+    """A log file read incrementally: each poll reads only the bytes appended since the last."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.modified = None
+        self._partial = b""
+        self._parser = LogParser()
+
+    def poll(self):
+        """Read what was appended since the last poll; returns True if the file grew."""
+        stat = os.stat(self.path)
+        self.modified = stat.st_mtime
+        if stat.st_size < self.offset:
+            # Truncated: the run was restarted into the same file
+            self.__init__(self.path)
+            self.modified = stat.st_mtime
+        if stat.st_size == self.offset:
+            return False
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(stat.st_size - self.offset)
+        self.offset += len(data)
+        # Keep an unfinished last line for the next poll
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        self._parser.feed(line.decode(errors='replace') for line in lines)
+        return True
+
+    @property
+    def run(self):
+        return merge_filename(dict(self._parser.run), self.path)
+
+    @property
+    def rounds(self):
+        return self._parser.rounds
+
+    @property
+    def complete(self):
+        return self._parser.run["total_time"] is not None
+
+
+def round_time(round_):
+    if round_["rr_time"] is None or round_["select_time"] is None:
+        return None
+    return round_["rr_time"] + round_["select_time"]
+
+
+def expected_rounds(coverage):
+    """Sampling rounds of a run whose seeds cover this fraction of the RR sets."""
+    if not coverage:
+        return None
+    return max(1, math.ceil(-math.log2(coverage)))
+
+
+def _delta_scale(index):
+    # Delta/PE of round index relative to round 1: 1, 1, 2, 4, ...
+    return 2 ** max(index - 2, 0)
+
+
+def round_cost(rounds):
+    """(overhead, seconds per RR set) of the finished rounds, fitted by least squares."""
+    deltas = [round_["delta_pe"] for round_ in rounds]
+    times = [round_time(round_) for round_ in rounds]
+    if len(set(deltas)) < 2:
+        return 0.0, times[-1] / deltas[-1]
+    mean_delta, mean_time = statistics.fmean(deltas), statistics.fmean(times)
+    slope = (sum((d - mean_delta) * (t - mean_time) for d, t in zip(deltas, times))
+             / sum((d - mean_delta) ** 2 for d in deltas))
+    overhead = mean_time - slope * mean_delta
+    if slope <= 0:
+        return mean_time, 0.0
+    if overhead < 0:
+        return 0.0, sum(d * t for d, t in zip(deltas, times)) / sum(d * d for d in deltas)
+    return overhead, slope
+
+
+def final_factor(run, rounds):
+    """Final phase time over the last sampling round time of a finished run, or None."""
+    times = [round_time(round_) for round_ in rounds]
+    if not times or not times[-1] or run["final_generateRR_time"] is None \
+            or run["final_selectseeds_time"] is None:
+        return None
+    return (run["final_generateRR_time"] + run["final_selectseeds_time"]) / times[-1]
+
+
+def remaining_time(run, rounds, idle, factor=DEFAULT_FINAL_FACTOR):
+    """(current round, expected rounds, seconds left) of a run still writing its log.
+
+    idle is how long ago the log was last written, i.e. how far into its
+    current step the run already is. Seconds left is None before the first
+    round has finished.
+    """
+    # "Fraction covered" is the last line of a round
+    finished = [round_ for round_ in rounds
+                if round_time(round_) is not None and round_["coverage"] is not None]
+    if not finished:
+        return len(rounds), None, None
+    last = finished[-1]
+
+    if run["theta_final_pe"] is not None:
+        # Sampling is over; only the final generation and selection are left
+        total = len(rounds)
+        left = factor * round_time(last)
+    else:
+        total = max(expected_rounds(last["coverage"]) or len(rounds), len(rounds))
+        overhead, per_set = round_cost(finished)
+        first = rounds[0]["delta_pe"]
+        projected = [overhead + per_set * first * _delta_scale(index)
+                     for index in range(last["round"] + 1, total + 1)]
+        left = sum(projected) + factor * (projected[-1] if projected else round_time(last))
+    return len(rounds), total, max(left - idle, 0.0)
+
+
+def config_key(run):
+    return tuple(run.get(field) for field in ("algorithm", "cores", "k", "eps"))
+
+
+class Monitor:
+    """The logs below some directories, polled incrementally, with per-run and sweep estimates."""
+
+    def __init__(self, roots, cells=None, output_dir=None, stall_after=DEFAULT_STALL_AFTER):
+        self.roots = roots
+        self.cells = cells or []
+        self.output_dir = output_dir
+        self.stall_after = stall_after
+        self.logs = {}
+
+    def poll(self):
+        for path in find_logs(self.roots):
+            if path not in self.logs:
+                self.logs[path] = TailedLog(path)
+        for log in self.logs.values():
+            if not log.complete:
+                try:
+                    log.poll()
+                except FileNotFoundError:
+                    continue
+
+    def _history(self):
+        # Final-phase factors and total times of the finished logs
+        factors, totals = [], {}
+        for log in self.logs.values():
+            if log.complete:
+                run = log.run
+                factor = final_factor(run, log.rounds)
+                if factor is not None:
+                    factors.append(factor)
+                totals.setdefault(config_key(run), []).append(run["total_time"])
+        factor = statistics.median(factors) if factors else DEFAULT_FINAL_FACTOR
+        return factor, {key: statistics.mean(values) for key, values in totals.items()}
+
+    def _failed(self):
+        # Journal time of the runs the sweep journal last recorded as failed
+        if self.output_dir is None:
+            return {}
+        failed = {}
+        for name, entry in Journal(self.output_dir).entries().items():
+            if entry["status"] == "failed":
+                finished = time.strptime(entry["finished"], "%Y-%m-%dT%H:%M:%S")
+                failed[f"log_{name}.txt"] = time.mktime(finished)
+        return failed
+
+    def status(self, now=None):
+        """Unfinished runs and sweep totals.
+
+        Returns (rows, sweep_left, unknown, done, pending): one row per
+        unfinished log (state running, stalled or failed), the estimated
+        seconds left in the sweep, how many running or pending runs have no
+        estimate yet (left out of sweep_left), and the number of finished
+        and not yet started runs. Stalled and failed runs have no estimate
+        and do not count towards the sweep.
+        """
+        now = time.time() if now is None else now
+        factor, totals = self._history()
+        failed = self._failed()
+        rows = []
+        for path, log in sorted(self.logs.items()):
+            if log.complete or log.modified is None:
+                continue
+            idle = max(now - log.modified, 0.0)
+            current, total, left = remaining_time(log.run, log.rounds, idle, factor)
+            # A relaunched run writes its log again after the failure was journaled
+            if log.modified <= failed.get(os.path.basename(path), -math.inf) + 1:
+                state, left = "failed", None
+            elif idle > self.stall_after:
+                state, left = "stalled", None
+            else:
+                state = "running"
+            rows.append({
+                "log": os.path.relpath(path),
+                "state": state,
+                "round": current,
+                "rounds": total,
+                "delta_pe": log.rounds[-1]["delta_pe"] if log.rounds else None,
+                "idle": idle,
+                "left": left,
+            })
+        done = sum(log.complete for log in self.logs.values())
+
+        pending = []
+        if self.output_dir is not None:
+            started = {os.path.basename(path) for path in self.logs}
+            pending = [cell for cell in self.cells if f"log_{cell['name']}.txt" not in started]
+        running = [row for row in rows if row["state"] == "running"]
+        work = [row["left"] for row in running]
+        for cell in pending:
+            # The k and eps logs do not name their core count
+            key = (cell["algorithm"], cell["cores"], cell["k"], cell["eps"])
+            work.append(totals.get(key, totals.get((key[0], None) + key[2:])))
+        known = [value for value in work if value is not None]
+        sweep_left = sum(known) / max(len(running), 1)
+        return rows, sweep_left, len(work) - len(known), done, len(pending)
+
+
+def _duration(seconds):
+    if seconds is None:
+        return "?"
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def report(monitor, out=sys.stdout):
+    rows, sweep_left, unknown, done, pending = monitor.status()
+    lines = [f"{'log':<56} {'state':>8} {'round':>9} {'Delta/PE':>10} {'idle':>8} {'left':>8}"]
+    for row in rows:
+        progress = f"{row['round']}/{row['rounds'] if row['rounds'] is not None else '?'}"
+        left = _duration(row["left"]) if row["state"] == "running" else "-"
+        lines.append(f"{row['log']:<56} {row['state']:>8} {progress:>9} {row['delta_pe'] or '':>10} "
+                     f"{row['idle']:7.0f}s {left:>8}")
+    running = sum(row["state"] == "running" for row in rows)
+    summary = (f"{running} running, {len(rows) - running} stalled or failed, {done} done, "
+               f"{pending} pending; sweep left: {_duration(sweep_left)}")
+    if unknown:
+        summary += f" + {unknown} runs without an estimate yet"
+    lines.append(summary)
+    out.write("\n".join(lines) + "\n")
+    out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Follow the logs of running IMM jobs and estimate their remaining time.")
+    parser.add_argument("roots", nargs="*", help="results directories to watch (default: the sweep's)")
+    parser.add_argument("--sweep", choices=sorted(PRESETS),
+                        help="sweep whose runs not started yet count towards the estimate")
+    parser.add_argument("--grid", help="JSON grid instead of a preset, as for imm_tools.sweep")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+    parser.add_argument("--stall-after", type=float, default=DEFAULT_STALL_AFTER,
+                        help="seconds without log output after which an unfinished run counts as stalled")
+    parser.add_argument("--once", action="store_true", help="print one report and exit")
+    args = parser.parse_args(argv)
+
+    cells, output_dir = [], None
+    if args.sweep or args.grid:
+        sweep = load_sweep(args.sweep, args.grid)
+        cells, output_dir = expand(sweep), sweep["output_dir"]
+    roots = args.roots or ([output_dir] if output_dir else [])
+    if not roots:
+        parser.error("give results directories to watch or a --sweep")
+
+    monitor = Monitor(roots, cells, output_dir, args.stall_after)
+    clear = "\033[H\033[J" if sys.stdout.isatty() and not args.once else ""
+    try:
+        while True:
+            monitor.poll()
+            sys.stdout.write(clear)
+            report(monitor)
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from imm_tools.ingest import ingest_runs
+from imm_tools.store import REPO_ROOT, repo_path
+from imm_tools.timeline import run_id, timeline_rows
+
+# Outlier repetitions and straggler rounds.
+#
+# Usage (from the repository root):
+#   python -m imm_tools.outliers figure8 figure10 "figures6&13" -o outliers.csv --rounds round_outliers.csv
+#   python -m imm_tools.outliers "figures6&13" --exclude     # also drop them from the figures
+#
+# Repetitions of one configuration (campaign, dataset, algorithm, cores, k,
+# eps) should take about the same time, so each run's total and phase times
+# are scored against the other repetitions with the robust z-score
+#   z = 0.6745 (x - median) / MAD
+# (Iglewicz and Hoaglin; the mean absolute deviation stands in when more
+# than half the values tie). Sampling rounds are scored the same way against
+# the same round of the other repetitions, which points at the round (and so
+# the time window) in which a slow node held a run back. A value is flagged
+# when |z| exceeds the threshold and it is also off the median by at least
+# --min-delta seconds and --min-ratio of the median, so neither timer jitter
+# nor a small spread inside a very tight group is flagged.
+#
+# --exclude appends the flagged runs to exclusions.csv at the repository
+# root, with the metric, value, score and date that got them excluded. The
+# figures (imm_tools.figures) leave out every run listed there; the file is
+# the audit trail, and deleting a line brings the run back.
+
+CONFIG_FIELDS = ["campaign", "dataset", "algorithm", "cores", "k", "eps"]
+
+RUN_METRICS = ["total_time", "generateRR_time", "selectseeds_time", "matrixGen_time", "kloops_time"]
+
+ROUND_METRICS = ["rr_time", "select_time"]
+
+OUTLIER_FIELDS = ["run_id"] + CONFIG_FIELDS + [
+    "repetition", "metric", "value", "median", "robust_z", "group_size",
+]
+
+ROUND_OUTLIER_FIELDS = OUTLIER_FIELDS[:8] + ["round", "delta_pe"] + OUTLIER_FIELDS[8:]
+
+EXCLUSIONS_FILE = os.path.join(REPO_ROOT, "exclusions.csv")
+
+EXCLUSION_FIELDS = ["run_id", "metric", "value", "median", "robust_z", "excluded_at"]
+
+# Scores need a few repetitions to mean anything
+MIN_GROUP = 3
+DEFAULT_THRESHOLD = 3.5
+DEFAULT_MIN_DELTA = 0.05
+DEFAULT_MIN_RATIO = 0.05
+
+
+def robust_z(df, by, value):
+    """(median, z, group size) of value within each group of by, as Series aligned with df.
+
+    z is NaN for groups smaller than MIN_GROUP and groups without spread.
+    """
+    grouped = df.groupby(by, dropna=False)[value]
+    median = grouped.transform("median")
+    deviation = (df[value] - median).abs()
+    by_deviation = deviation.groupby([df[column] for column in by], dropna=False)
+    mad = by_deviation.transform("median")
+    mean_ad = by_deviation.transform("mean")
+    size = grouped.transform("count")
+
+    scale = np.where(mad > 0, mad / 0.6745, 1.2533 * mean_ad)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (df[value] - median) / scale
+    z = z.where((size >= MIN_GROUP) & (scale > 0))
+    return median, z, size
+
+
+def flag(df, by, metrics, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA,
+         min_ratio=DEFAULT_MIN_RATIO):
+    """Rows of df (one per flagged metric) with metric, value, median, robust_z and group_size."""
+    flagged = []
+    for metric in metrics:
+        if metric not in df:
+            continue
+        values = df.dropna(subset=[metric])
+        median, z, size = robust_z(values, by, metric)
+        floor = np.maximum(min_delta, min_ratio * median.abs())
+        hit = (z.abs() > threshold) & ((values[metric] - median).abs() >= floor)
+        flagged.append(values[hit].assign(
+            metric=metric, value=values.loc[hit, metric], median=median[hit],
+            robust_z=z[hit].round(2), group_size=size[hit]))
+    if not flagged:
+        return pd.DataFrame()
+    return pd.concat(flagged, ignore_index=True)
+
+
+def load(roots, workers=None, use_cache=True):
+    """(runs, rounds) DataFrames of every log below roots, keyed by run_id."""
+    runs, rounds = [], []
+    for _, run, run_rounds in ingest_runs(roots, workers, use_cache=use_cache):
+        runs.append(dict(run, run_id=run_id(run)))
+        rounds.extend(timeline_rows(run, run_rounds))
+    return pd.DataFrame(runs), pd.DataFrame(rounds)
+
+
+def find_outliers(runs, rounds, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA,
+                  min_ratio=DEFAULT_MIN_RATIO):
+    """(run outliers, round outliers) as OUTLIER_FIELDS / ROUND_OUTLIER_FIELDS DataFrames."""
+    run_outliers = flag(runs, CONFIG_FIELDS, RUN_METRICS, threshold, min_delta, min_ratio)
+    round_outliers = flag(rounds, CONFIG_FIELDS + ["round"], ROUND_METRICS, threshold, min_delta, min_ratio)
+    # Integer keys come back as float wherever a campaign leaves them empty
+    integers = {"cores": "Int64", "k": "Int64", "repetition": "Int64"}
+    return (run_outliers.reindex(columns=OUTLIER_FIELDS).astype(integers),
+            round_outliers.reindex(columns=ROUND_OUTLIER_FIELDS).astype(integers))
+
+
+def normalize_run_id(run):
+    """run_id with its directory in the store's form (see store.repo_path)."""
+    source, _, name = run.rpartition("/")
+    if os.path.isabs(source):
+        source = repo_path(source)
+    else:
+        source = os.path.normpath(source).replace(os.sep, "/")
+    return f"{source}/{name}"
+
+
+def excluded_runs(path=EXCLUSIONS_FILE):
+    """run_ids listed in an exclusions file (empty if there is none)."""
+    if path is None or not os.path.exists(path):
+        return set()
+    with open(path, newline='') as file:
+        return {normalize_run_id(row["run_id"]) for row in csv.DictReader(file)}
+
+
+def store_run_ids(df):
+    return df["source"].astype(str) + "/" + df["file"].astype(str)
+
+
+def drop_excluded(df, run_ids):
+    """df without the runs in run_ids; needs the source and file columns of the store."""
+    if not run_ids or "source" not in df or "file" not in df:
+        return df
+    return df[~store_run_ids(df).isin(run_ids)]
+
+
+def warn_unmatched(df, run_ids, out=sys.stderr):
+    """Warn about excluded run_ids that name no run of df (the whole store); returns them."""
+    unmatched = sorted(set(run_ids) - set(store_run_ids(df)))
+    for run in unmatched:
+        out.write(f"warning: excluded run {run} is not in the results store\n")
+    return unmatched
+
+
+def append_exclusions(outliers, path=EXCLUSIONS_FILE):
+    """Add the runs of outliers not yet in the exclusions file; returns how many were added."""
+    listed = excluded_runs(path)
+    fresh = outliers[~outliers["run_id"].isin(listed)].drop_duplicates("run_id")
+    if fresh.empty:
+        return 0
+    fresh = fresh.assign(excluded_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    new_file = not os.path.exists(path)
+    fresh[EXCLUSION_FIELDS].to_csv(path, mode='a', header=new_file, index=False)
+    return len(fresh)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag outlier repetitions and straggler sampling rounds.")
+    parser.add_argument("roots", nargs="+", help="directories to search for log_*.txt files")
+    parser.add_argument("-o", "--output", default="outliers.csv", help="flagged runs CSV")
+    parser.add_argument("--rounds", help="also write the flagged sampling rounds to this CSV")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="robust |z| above which a value is flagged")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="seconds a value must also be away from its group median")
+    parser.add_argument("--min-ratio", type=float, default=DEFAULT_MIN_RATIO,
+                        help="fraction of the median a value must also be away from it")
+    parser.add_argument("--exclude", action="store_true",
+                        help="append the runs flagged on --exclude-metric to exclusions.csv")
+    parser.add_argument("--exclude-metric", action="append",
+                        help="metric whose outliers are excluded, repeatable (default: total_time)")
+    parser.add_argument("--exclusions", default=EXCLUSIONS_FILE, help="exclusions file to append to (pass the same file to imm_tools.figures --exclusions)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes for parsing logs (default: number of CPUs)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="reparse every log instead of using the .parse_cache.sqlite sidecars")
+    args = parser.parse_args(argv)
+
+    runs, rounds = load(args.roots, args.workers, use_cache=not args.no_cache)
+    run_outliers, round_outliers = find_outliers(runs, rounds, args.threshold, args.min_delta, args.min_ratio)
+    run_outliers.to_csv(args.output, index=False)
+    if args.rounds:
+        round_outliers.to_csv(args.rounds, index=False)
+    print(f"{len(run_outliers)} outlier values in {run_outliers['run_id'].nunique()} of {len(runs)} runs, "
+          f"{len(round_outliers)} outlier round values")
+
+    if args.exclude:
+        metrics = args.exclude_metric or ["total_time"]
+        added = append_exclusions(run_outliers[run_outliers["metric"].isin(metrics)], args.exclusions)
+        print(f"Excluded {added} more runs from the figures ({os.path.relpath(args.exclusions)})")
+
+
+if __name__ == "__main__":
+    main()
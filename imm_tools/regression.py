@@ -0,0 +1,149 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import scipy.stats as st
+
+from imm_tools.ingest import ingest
+from imm_tools.speedup import CONFIG_FIELDS
+from imm_tools.store import read_runs
+
+# Performance-regression check of a new campaign against a baseline.
+#
+# Usage (from the repository root):
+#   python -m imm_tools.regression baseline.parquet figures6&13/com-DBLP/results -o regression.csv
+#
+# Both sides are run tables: an ingested .parquet store or CSV, or a
+# directory of logs that is ingested on the fly. Runs are matched per
+# configuration (campaign, dataset, cores, k, eps and algorithm) and every
+# configuration is tested at once from its per-group summaries:
+#   - a one-sided Welch t-test on log time (run times are noisy in
+#     proportion to their length, so the log makes the variances comparable),
+#     with Benjamini-Hochberg adjusted p-values (q) over all configurations
+#     and metrics,
+#   - the slowdown mean(new) / mean(baseline) - 1 as effect size.
+# A configuration regresses when q < alpha and the slowdown is at least the
+# threshold, so a tiny but consistent slowdown does not fail the check and
+# neither does a large difference within the noise. Configurations with a
+# single run on either side cannot be tested and are reported as such.
+# The exit status is 1 when anything regressed.
+
+KEY_FIELDS = CONFIG_FIELDS + ["algorithm"]
+
+REGRESSION_FIELDS = KEY_FIELDS + [
+    "metric", "n_base", "n_new", "mean_base", "mean_new", "slowdown", "hedges_g",
+    "p_value", "q_value", "status",
+]
+
+DEFAULT_METRICS = ["total_time"]
+
+
+def load_table(path, metrics):
+    """Run table with KEY_FIELDS and the metrics, from a store/CSV or a directory of logs."""
+    columns = KEY_FIELDS + metrics
+    if os.path.isdir(path):
+        df = pd.DataFrame(ingest([path]))
+        return df[[column for column in columns if column in df.columns]]
+    return read_runs(path, columns=columns)
+
+
+def _summaries(df, metric):
+    values = df.dropna(subset=[metric])
+    values = values[values[metric] > 0].assign(log=lambda frame: np.log(frame[metric]))
+    return values.groupby(KEY_FIELDS, dropna=False).agg(
+        n=(metric, "size"), mean=(metric, "mean"), log_mean=("log", "mean"), log_var=("log", "var"))
+
+
+def benjamini_hochberg(p_values):
+    """BH adjusted p-values; NaN entries are left out and stay NaN."""
+    p = np.asarray(p_values, dtype=float)
+    q = np.full(len(p), np.nan)
+    tested = np.flatnonzero(~np.isnan(p))
+    if not len(tested):
+        return q
+    order = tested[np.argsort(p[tested])]
+    ranked = p[order] * len(order) / np.arange(1, len(order) + 1)
+    q[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return q
+
+
+def compare(baseline, candidate, metrics=DEFAULT_METRICS, alpha=0.05, threshold=0.05):
+    """REGRESSION_FIELDS rows for every configuration and metric present on both sides."""
+    tables = []
+    for metric in metrics:
+        base = _summaries(baseline, metric)
+        new = _summaries(candidate, metric)
+        table = base.join(new, how="inner", lsuffix="_base", rsuffix="_new").reset_index()
+        table["metric"] = metric
+        tables.append(table)
+    table = pd.concat(tables, ignore_index=True)
+    if table.empty:
+        return pd.DataFrame(columns=REGRESSION_FIELDS)
+    # Integer keys come back as float wherever a campaign leaves them empty
+    table = table.astype({"cores": "Int64", "k": "Int64"})
+
+    n_base, n_new = table["n_base"].to_numpy(float), table["n_new"].to_numpy(float)
+    var_base, var_new = table["log_var_base"].to_numpy(float), table["log_var_new"].to_numpy(float)
+    diff = table["log_mean_new"].to_numpy() - table["log_mean_base"].to_numpy()
+    testable = (n_base >= 2) & (n_new >= 2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Welch's t and Welch-Satterthwaite degrees of freedom, all groups at once
+        se2_base, se2_new = var_base / n_base, var_new / n_new
+        se = np.sqrt(se2_base + se2_new)
+        dof = (se2_base + se2_new) ** 2 / (se2_base ** 2 / (n_base - 1) + se2_new ** 2 / (n_new - 1))
+        t = diff / se
+        p_value = np.where(testable, st.t.sf(t, dof), np.nan)
+        # Identical runs on both sides: no variance, and no evidence either way
+        p_value = np.where(testable & (se == 0), np.where(diff > 0, 0.0, 1.0), p_value)
+
+        pooled = np.sqrt(((n_base - 1) * var_base + (n_new - 1) * var_new) / (n_base + n_new - 2))
+        correction = 1 - 3 / (4 * (n_base + n_new) - 9)
+        hedges_g = np.where(testable & (pooled > 0), diff / pooled * correction, np.nan)
+
+    q_value = benjamini_hochberg(p_value)
+    slowdown = table["mean_new"].to_numpy() / table["mean_base"].to_numpy() - 1
+    significant = q_value < alpha
+    table["status"] = np.select(
+        [~testable, significant & (slowdown >= threshold)],
+        ["untested", "regressed"], default="ok")
+    table["slowdown"] = slowdown
+    table["hedges_g"] = hedges_g
+    table["p_value"] = p_value
+    table["q_value"] = q_value
+    return table[REGRESSION_FIELDS]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag configurations that got slower than a stored baseline.")
+    parser.add_argument("baseline", help="baseline run table (.parquet store, ingest CSV or results directory)")
+    parser.add_argument("candidate", help="new run table (.parquet store, ingest CSV or results directory)")
+    parser.add_argument("-m", "--metric", action="append",
+                        help="time column to compare, repeatable (default: total_time)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="false discovery rate of the tests")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="smallest relative slowdown that counts as a regression (0.05 = 5%%)")
+    parser.add_argument("-o", "--output", help="write every compared configuration to this CSV")
+    args = parser.parse_args(argv)
+
+    metrics = args.metric or DEFAULT_METRICS
+    table = compare(load_table(args.baseline, metrics), load_table(args.candidate, metrics),
+                    metrics, args.alpha, args.threshold)
+    if args.output:
+        table.to_csv(args.output, index=False)
+
+    regressed = table[table["status"] == "regressed"]
+    untested = int((table["status"] == "untested").sum())
+    print(f"Compared {len(table)} configurations: {len(regressed)} regressed, {untested} untested")
+    if len(regressed):
+        shown = regressed.assign(slowdown=(100 * regressed["slowdown"]).round(1)).round(
+            {"mean_base": 3, "mean_new": 3, "hedges_g": 2, "q_value": 4})
+        print(shown.drop(columns=["p_value", "status"]).to_string(index=False))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
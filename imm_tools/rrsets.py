@@ -0,0 +1,258 @@
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from imm_tools.graph import load_graph
+
+# Reference Linear Threshold RR-set generation in NumPy.
+#
+# Usage (from the repository root):
+#   python -m imm_tools.rrsets input_files/com-dblp.ungraph-LT.txt -n 100000
+#
+# Under LT an RR set is a reverse random walk: start at a uniformly random
+# node, move to one in-neighbour u of the current node with probability
+# w(u, v) (or stop with the remaining probability), and stop when the walk
+# returns to a node already in the set. A batch of walks advances one step
+# per iteration: a single searchsorted over the graph's cumulative in-edge
+# weights picks the next node of every live walk at once.
+#
+# RR sets are returned flat: the nodes of set i are
+# nodes[offsets[i]:offsets[i + 1]], starting with its root.
+#
+# generate_rr_sets_parallel splits the sets over worker processes the way
+# the binaries split them over ranks (Delta/PE). Each worker maps the binary
+# CSR copy of the graph (see imm_tools.graph), draws from its own
+# SeedSequence stream and writes straight into its slice of shared memory
+# buffers, so only a few integers per worker travel back to the parent.
+
+DEFAULT_BATCH = 4096
+
+# Node buffer headroom over the size estimated from a pilot sample
+CAPACITY_FACTOR = 1.25
+PILOT_SETS = 2000
+
+
+def cumulative_weights(graph):
+    """(base, cum): cum is the running weight sum over all in-edges, base[v] the sum before v's row."""
+    cum = np.cumsum(graph.weights, dtype=np.float64)
+    base = np.concatenate([[0.0], cum])[graph.offsets[:-1]]
+    return base, cum
+
+
+def _walk_batch(graph, base, cum, size, rng):
+    # One column per step: the node each walk visited at that step, -1 once it stopped
+    current = rng.integers(0, graph.num_nodes, size=size)
+    columns = [current.astype(np.int32)]
+    walk = np.arange(size)
+
+    while len(walk):
+        r = rng.random(len(walk))
+        position = np.searchsorted(cum, base[current] + r, side='right')
+        moved = position < graph.offsets[current + 1]
+        walk, position = walk[moved], position[moved]
+        following = graph.sources[position]
+
+        seen = np.zeros(len(walk), dtype=bool)
+        for column in columns:
+            seen |= column[walk] == following
+        walk, current = walk[~seen], following[~seen]
+
+        column = np.full(size, -1, dtype=np.int32)
+        column[walk] = current
+        columns.append(column)
+
+    paths = np.stack(columns[:-1], axis=1)
+    valid = paths >= 0
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(valid.sum(axis=1), out=offsets[1:])
+    return offsets, paths[valid]
+
+
+def generate_rr_sets(graph, count, rng=None, batch=DEFAULT_BATCH):
+    """count LT RR sets of graph as flat (offsets, nodes) arrays (int64, int32)."""
+    rng = rng if rng is not None else np.random.default_rng()
+    base, cum = cumulative_weights(graph)
+    offsets = [np.zeros(1, dtype=np.int64)]
+    nodes = []
+    total = 0
+    for start in range(0, count, batch):
+        batch_offsets, batch_nodes = _walk_batch(graph, base, cum, min(batch, count - start), rng)
+        offsets.append(batch_offsets[1:] + total)
+        nodes.append(batch_nodes)
+        total += len(batch_nodes)
+    nodes = np.concatenate(nodes) if nodes else np.empty(0, dtype=np.int32)
+    return np.concatenate(offsets), nodes
+
+
+class SharedRRSets:
+    """RR sets whose offsets/nodes arrays live in shared memory; close() releases them."""
+
+    def __init__(self, offsets_shm, nodes_shm, count, total):
+        self._segments = [offsets_shm, nodes_shm]
+        self.offsets = np.ndarray(count + 1, dtype=np.int64, buffer=offsets_shm.buf)
+        self.nodes = np.ndarray(total, dtype=np.int32, buffer=nodes_shm.buf)
+
+    def close(self):
+        self.offsets = self.nodes = None
+        _release(self._segments)
+        self._segments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _release(segments):
+    for segment in segments:
+        segment.close()
+        segment.unlink()
+
+
+def _fill_range(graph, sizes, nodes, count, capacity, rng, batch):
+    base, cum = cumulative_weights(graph)
+    done = written = 0
+    while done < count:
+        size = min(batch, count - done)
+        batch_offsets, batch_nodes = _walk_batch(graph, base, cum, size, rng)
+        if written + len(batch_nodes) > capacity:
+            # Out of room: the parent generates the rest
+            break
+        nodes[written:written + len(batch_nodes)] = batch_nodes
+        sizes[done:done + size] = np.diff(batch_offsets)
+        done += size
+        written += len(batch_nodes)
+    return done, written
+
+
+def _generate_range(task):
+    # Worker: write the sizes of sets first..first + count - 1 into offsets[1:]
+    # and their nodes into nodes[start:start + capacity]
+    (graph_path, undirected, weighted, offsets_name, nodes_name, total_sets,
+     first, count, start, capacity, seed, batch) = task
+    graph = load_graph(graph_path, undirected, weighted)
+    # Pool workers share the parent's resource tracker, which unlinks the
+    # segments once the parent releases them
+    offsets_shm = shared_memory.SharedMemory(name=offsets_name)
+    nodes_shm = shared_memory.SharedMemory(name=nodes_name)
+    try:
+        offsets = np.ndarray(total_sets + 1, dtype=np.int64, buffer=offsets_shm.buf)
+        nodes = np.ndarray(start + capacity, dtype=np.int32, buffer=nodes_shm.buf)
+        result = _fill_range(graph, offsets[1 + first:1 + first + count], nodes[start:],
+                             count, capacity, np.random.default_rng(seed), batch)
+        del offsets, nodes
+        return result
+    finally:
+        offsets_shm.close()
+        nodes_shm.close()
+
+
+def generate_rr_sets_parallel(graph_path, count, workers=None, seed=None, batch=DEFAULT_BATCH,
+                              undirected=True, weighted=True):
+    """count LT RR sets generated by a process pool, as a SharedRRSets.
+
+    Worker w generates its share of the sets from the w-th child of
+    SeedSequence(seed) into its slice of one shared node buffer sized from a
+    pilot sample; the slices are then packed together in place. If a worker
+    runs out of room, the parent generates its remaining sets and the buffer
+    is rebuilt at the exact size.
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).spawn(workers + 1)
+    parent_rng = np.random.default_rng(seeds[-1])
+    graph = load_graph(graph_path, undirected, weighted)
+    pilot_offsets, _ = generate_rr_sets(graph, min(PILOT_SETS, count), parent_rng, batch)
+    mean_size = pilot_offsets[-1] / max(len(pilot_offsets) - 1, 1)
+
+    shares = [count // workers + (w < count % workers) for w in range(workers)]
+    firsts = [sum(shares[:w]) for w in range(workers)]
+    capacities = [math.ceil(share * mean_size * CAPACITY_FACTOR) + batch for share in shares]
+    starts = [sum(capacities[:w]) for w in range(workers)]
+
+    offsets_shm = shared_memory.SharedMemory(create=True, size=8 * (count + 1))
+    nodes_shm = shared_memory.SharedMemory(create=True, size=4 * sum(capacities))
+    try:
+        tasks = [(graph_path, undirected, weighted, offsets_shm.name, nodes_shm.name, count,
+                  firsts[w], shares[w], starts[w], capacities[w], seeds[w], batch)
+                 for w in range(workers)]
+        if workers == 1:
+            results = [_generate_range(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_generate_range, tasks))
+
+        offsets = np.ndarray(count + 1, dtype=np.int64, buffer=offsets_shm.buf)
+        nodes = np.ndarray(sum(capacities), dtype=np.int32, buffer=nodes_shm.buf)
+        segments = []
+        for w, (done, written) in enumerate(results):
+            segments.append(nodes[starts[w]:starts[w] + written])
+            if done < shares[w]:
+                rest_offsets, rest_nodes = generate_rr_sets(graph, shares[w] - done, parent_rng, batch)
+                offsets[1 + firsts[w] + done:1 + firsts[w] + shares[w]] = np.diff(rest_offsets)
+                segments.append(rest_nodes)
+        offsets[0] = 0
+        np.cumsum(offsets, out=offsets)
+        total = int(offsets[-1])
+
+        if all(done == share for (done, _), share in zip(results, shares)):
+            # Pack the worker slices to the left; each moves at most to its own start
+            position = 0
+            for segment in segments:
+                nodes[position:position + len(segment)] = segment
+                position += len(segment)
+        else:
+            packed_shm = shared_memory.SharedMemory(create=True, size=4 * max(total, 1))
+            np.ndarray(total, dtype=np.int32, buffer=packed_shm.buf)[:] = np.concatenate(segments)
+            del segments, nodes
+            _release([nodes_shm])
+            nodes_shm = packed_shm
+        del offsets
+        segments = nodes = None
+        return SharedRRSets(offsets_shm, nodes_shm, count, total)
+    except BaseException:
+        offsets = nodes = segments = None
+        _release([offsets_shm, nodes_shm])
+        raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate LT RR sets of a graph with NumPy.")
+    parser.add_argument("graph", help="*-LT.txt edge list")
+    parser.add_argument("-n", "--count", type=int, default=100000, help="number of RR sets")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="RR sets per vectorized batch")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes writing into shared memory (0: number of CPUs)")
+    parser.add_argument("--directed", action="store_true", help="do not add reverse edges (no -u)")
+    parser.add_argument("--unweighted", action="store_true", help="use 1/indegree weights (no -w)")
+    parser.add_argument("--no-cache", action="store_true", help="parse the text file instead of its .csr copy")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    graph = load_graph(args.graph, undirected=not args.directed, weighted=not args.unweighted,
+                       use_cache=not args.no_cache)
+    print(f"Total Number of Nodes in G: {graph.num_nodes}")
+    print(f"Total Number of Edges in G: {graph.num_edges}")
+    print(f"Time taken to read the graph: {time.perf_counter() - start:8.3f} seconds")
+
+    start = time.perf_counter()
+    if args.workers == 1:
+        offsets, nodes = generate_rr_sets(graph, args.count, np.random.default_rng(args.seed), args.batch)
+        total = len(nodes)
+    else:
+        with generate_rr_sets_parallel(args.graph, args.count, args.workers or None, args.seed, args.batch,
+                                       not args.directed, not args.unweighted) as rr_sets:
+            total = len(rr_sets.nodes)
+    elapsed = time.perf_counter() - start
+    print(f"Time taken to generate RR sets: {elapsed:8.3f} seconds")
+    print(f"RR sets: {args.count}, average size: {total / max(args.count, 1):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import argparse
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+from imm_tools.store import DEFAULT_STORE, read_runs
+from imm_tools.sweep import CORES_PER_NODE, node_count
+
+# Per-phase strong-scaling models fitted to the scaling campaign.
+#
+# Usage (from the repository root, after ingesting into results.parquet):
+#   python -m imm_tools.scalingmodel -o models.csv --predictions predictions.csv \
+#       --predict 1152 1536 3072
+#
+# Every phase time of every (dataset, algorithm) is modeled as
+#   T(P) = serial + parallel / P + comm * log2(P)
+# on P cores: a part that does not shrink, a part that divides evenly over
+# the cores and a tree-collective term that grows with log P. The three
+# coefficients are kept nonnegative (a negative term has no physical meaning
+# and wrecks extrapolation) and residuals are relative, so 24-core and
+# 768-core runs weigh the same. All groups are fitted together: the
+# repetitions become one padded (groups x runs x 3) design array, and every
+# subset of terms is solved for every group with batched normal equations;
+# the best nonnegative candidate of each group is its exact NNLS fit.
+#
+# The predictions give each phase and the total at measured and requested
+# core counts, with parallel efficiency relative to the smallest measured
+# core count, T(P0) P0 / (T(P) P).
+
+PHASES = ["generateRR_time", "selectseeds_time", "matrixGen_time", "kloops_time", "total_time"]
+
+TERMS = ["serial", "parallel", "comm"]
+
+MODEL_FIELDS = [
+    "dataset", "algorithm", "phase", "points", "min_cores", "max_cores",
+] + TERMS + ["rel_rmse", "optimal_cores"]
+
+GROUP_FIELDS = ["dataset", "algorithm"]
+
+
+def design(cores):
+    """Model terms [1, 1/P, log2 P] for an array of core counts, shape (..., 3)."""
+    cores = np.asarray(cores, dtype=float)
+    return np.stack([np.ones_like(cores), 1.0 / cores, np.log2(cores)], axis=-1)
+
+
+def fit_nonnegative(X, y, weights):
+    """Batched nonnegative weighted least squares.
+
+    X is (groups, rows, terms), y and weights are (groups, rows); padding rows
+    have weight 0. Returns (coefficients (groups, terms), weighted SSE).
+    """
+    groups, _, terms = X.shape
+    best = np.zeros((groups, terms))
+    best_sse = np.full(groups, np.inf)
+    sqrt_w = np.sqrt(weights)[..., None]
+    for size in range(terms, 0, -1):
+        for subset in itertools.combinations(range(terms), size):
+            mask = np.zeros(terms)
+            mask[list(subset)] = 1.0
+            Xw = X * mask * sqrt_w
+            yw = y * sqrt_w[..., 0]
+            A = np.swapaxes(Xw, 1, 2) @ Xw
+            b = np.einsum('grt,gr->gt', Xw, yw)
+            beta = (np.linalg.pinv(A) @ b[..., None])[..., 0] * mask
+            sse = ((np.einsum('grt,gt->gr', Xw, beta) - yw) ** 2).sum(axis=1)
+            better = (beta >= -1e-12).all(axis=1) & (sse < best_sse - 1e-15)
+            best[better] = np.maximum(beta[better], 0.0)
+            best_sse[better] = sse[better]
+    return best, best_sse
+
+
+def optimal_cores(parallel, comm):
+    """Core count where parallel / P + comm * log2 P is smallest, or None.
+
+    dT/dP = 0 at P = parallel ln 2 / comm. Without a comm term more cores
+    always help, and without a parallel term (or below one core) the phase
+    does not scale at all, so neither has an optimum.
+    """
+    if comm <= 0 or parallel <= 0:
+        return None
+    cores = round(parallel * math.log(2) / comm)
+    return cores if cores >= 1 else None
+
+
+def fit_models(df, phases=PHASES):
+    """One MODEL_FIELDS row per (dataset, algorithm, phase) with timed runs."""
+    groups, samples = [], []
+    for key, group in df.groupby(GROUP_FIELDS, sort=True):
+        for phase in phases:
+            if phase not in group:
+                continue
+            points = group.dropna(subset=[phase])
+            points = points[points[phase] > 0]
+            # Three terms need at least three core counts
+            if points["cores"].nunique() < 3:
+                continue
+            groups.append(key + (phase,))
+            samples.append((points["cores"].to_numpy(float), points[phase].to_numpy(float)))
+    if not groups:
+        return pd.DataFrame(columns=MODEL_FIELDS)
+
+    width = max(len(cores) for cores, _ in samples)
+    cores = np.ones((len(samples), width))
+    times = np.zeros((len(samples), width))
+    weights = np.zeros((len(samples), width))
+    for i, (group_cores, group_times) in enumerate(samples):
+        cores[i, :len(group_cores)] = group_cores
+        times[i, :len(group_times)] = group_times
+        # Relative residuals: (fit - t) / t
+        weights[i, :len(group_times)] = 1.0 / group_times ** 2
+
+    coefficients, sse = fit_nonnegative(design(cores), times, weights)
+    counts = (weights > 0).sum(axis=1)
+    rows = []
+    for (dataset, algorithm, phase), (serial, parallel, comm), error, count, (group_cores, _) in zip(
+            groups, coefficients, sse, counts, samples):
+        rows.append({
+            "dataset": dataset,
+            "algorithm": algorithm,
+            "phase": phase,
+            "points": int(count),
+            "min_cores": int(group_cores.min()),
+            "max_cores": int(group_cores.max()),
+            "serial": serial,
+            "parallel": parallel,
+            "comm": comm,
+            "rel_rmse": math.sqrt(error / count),
+            "optimal_cores": optimal_cores(parallel, comm),
+        })
+    models = pd.DataFrame(rows, columns=MODEL_FIELDS)
+    models["optimal_cores"] = models["optimal_cores"].astype("Int64")
+    return models
+
+
+def predict(models, cores):
+    """Predicted times of every model row at each core count, shape (models, cores)."""
+    coefficients = models[TERMS].to_numpy(float)
+    return coefficients @ design(cores).T
+
+
+def prediction_table(models, df, cores, cores_per_node=CORES_PER_NODE):
+    """Per (dataset, algorithm, cores): measured mean total, predicted phases, efficiency.
+
+    cores is added to the measured core counts of each group; efficiency is
+    from the total_time model relative to the group's smallest measured core
+    count.
+    """
+    rows = []
+    measured = df.groupby(GROUP_FIELDS + ["cores"])["total_time"].mean()
+    for key, group_models in models.groupby(GROUP_FIELDS, sort=True):
+        in_group = (df["dataset"] == key[0]) & (df["algorithm"] == key[1])
+        group_cores = sorted(set(df.loc[in_group, "cores"].astype(int)) | set(cores))
+        baseline = int(group_models["min_cores"].min())
+        values = predict(group_models, group_cores + [baseline])
+        phases = dict(zip(group_models["phase"], values))
+        for i, p in enumerate(group_cores):
+            row = dict(zip(GROUP_FIELDS, key))
+            row.update({"cores": p, "nodes": node_count(p, cores_per_node),
+                        "measured_total": measured.get(key + (p,))})
+            row.update({phase: float(phase_values[i]) for phase, phase_values in phases.items()})
+            if "total_time" in phases:
+                total = phases["total_time"]
+                row["efficiency"] = total[-1] * baseline / (total[i] * p)
+            rows.append(row)
+    return pd.DataFrame(rows, columns=GROUP_FIELDS + ["cores", "nodes", "measured_total"]
+                        + PHASES + ["efficiency"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit per-phase strong-scaling models and predict unmeasured core counts.")
+    parser.add_argument("-i", "--input", default=DEFAULT_STORE,
+                        help="ingested run table (.parquet store or ingest CSV)")
+    parser.add_argument("--campaign", default="scaling", help="campaign whose runs vary the core count")
+    parser.add_argument("-o", "--output", default="models.csv", help="fitted coefficients CSV")
+    parser.add_argument("--predictions", default="predictions.csv", help="predicted times and efficiency CSV")
+    parser.add_argument("--predict", type=int, nargs="*", default=[1152, 1536, 3072],
+                        help="core counts to predict besides the measured ones")
+    parser.add_argument("--cores-per-node", type=int, default=CORES_PER_NODE)
+    args = parser.parse_args(argv)
+
+    df = read_runs(args.input, columns=GROUP_FIELDS + ["campaign", "cores"] + PHASES,
+                   filters=[("campaign", "==", args.campaign)])
+    models = fit_models(df)
+    models.to_csv(args.output, index=False)
+    predictions = prediction_table(models, df, args.predict, args.cores_per_node)
+    predictions.to_csv(args.predictions, index=False)
+
+    for row in models[models["phase"] == "total_time"].itertuples():
+        best = f"{row.optimal_cores} cores" if pd.notna(row.optimal_cores) else "none"
+        print(f"{row.dataset:>14} {row.algorithm}: serial {row.serial:.3f} s, parallel {row.parallel:.1f} s*core, "
+              f"comm {row.comm:.4f} s/doubling, fit error {100 * row.rel_rmse:.1f}%, fastest at {best}")
+    print(f"Wrote {len(models)} models to {args.output} and {len(predictions)} predictions to {args.predictions}")
+
+
+if __name__ == "__main__":
+    main()
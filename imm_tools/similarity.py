@@ -0,0 +1,179 @@
+import argparse
+import os
+
+import numpy as np
+import scipy.sparse as sp
+
+from imm_tools.ingest import ingest_runs, write_csv
+from imm_tools.spread import read_seeds
+
+# Similarity of the seed sets (inf_*.txt) across runs.
+#
+# Usage (from the repository root):
+#   python -m imm_tools.similarity figure8 figure10 "figures6&13" -o stability.csv --pairs pairs.csv
+#
+# Every inf_*.txt next to a parsed log is loaded into one (runs x max k)
+# int32 matrix, padded with -1, in file order. Per dataset, the matrix
+# becomes a sparse run x node incidence matrix B and a matching matrix R of
+# positions, and a handful of sparse products give every pairwise
+# statistic at once:
+#   - jaccard:   |A & B| / |A | B|, from B @ B.T
+#   - rank_corr: Pearson correlation of the positions in the files of the
+#                seeds two runs share (how similarly they order common
+#                seeds), from the sums R @ B.T, R @ R.T, (R * R) @ B.T
+# Runs are then grouped by configuration: repetitions of one algorithm give
+# its stability, and 1D x 2D pairs of the same configuration show whether
+# both algorithms pick the same influencers.
+
+CONFIG_FIELDS = ["dataset", "campaign", "cores", "k", "eps"]
+
+PAIR_FIELDS = ["file_a", "file_b", "common", "jaccard", "rank_corr"]
+
+STABILITY_FIELDS = CONFIG_FIELDS + [
+    "algorithm", "runs", "pairs", "mean_seeds", "mean_jaccard", "min_jaccard",
+    "mean_rank_corr", "core_fraction",
+]
+
+
+def seed_path(log_path):
+    directory, name = os.path.split(log_path)
+    return os.path.join(directory, "inf_" + name[len("log_"):])
+
+
+def load_seed_matrix(roots, workers=None, use_cache=True):
+    """(runs, matrix): run dicts with seed files, and their seeds as a padded int32 matrix."""
+    runs, seed_lists = [], []
+    for path, run, _ in ingest_runs(roots, workers, use_cache=use_cache):
+        inf = seed_path(path)
+        if not os.path.exists(inf):
+            continue
+        run = dict(run, seed_file=inf)
+        runs.append(run)
+        seed_lists.append(read_seeds(inf, run.get("graph_nodes")))
+
+    width = max((len(seeds) for seeds in seed_lists), default=0)
+    matrix = np.full((len(seed_lists), width), -1, dtype=np.int32)
+    for row, seeds in enumerate(seed_lists):
+        matrix[row, :len(seeds)] = seeds
+    return runs, matrix
+
+
+def pairwise(matrix):
+    """(common, jaccard, rank_corr) matrices over all pairs of rows of a seed matrix."""
+    rows, cols = np.nonzero(matrix >= 0)
+    nodes = matrix[rows, cols]
+    shape = (len(matrix), int(nodes.max(initial=-1)) + 1)
+    incidence = sp.csr_matrix((np.ones(len(rows)), (rows, nodes)), shape=shape)
+    positions = sp.csr_matrix((cols + 1.0, (rows, nodes)), shape=shape)
+    squares = positions.multiply(positions)
+
+    common = (incidence @ incidence.T).toarray()
+    sizes = np.diag(common)
+    union = sizes[:, None] + sizes[None, :] - common
+    with np.errstate(invalid='ignore', divide='ignore'):
+        jaccard = np.where(union > 0, common / union, np.nan)
+
+        # Sums over the shared seeds of each pair (a: row run, b: column run)
+        sum_a = (positions @ incidence.T).toarray()
+        sum_b = sum_a.T
+        sum_ab = (positions @ positions.T).toarray()
+        sum_aa = (squares @ incidence.T).toarray()
+        sum_bb = sum_aa.T
+        covariance = common * sum_ab - sum_a * sum_b
+        spread = np.sqrt((common * sum_aa - sum_a ** 2) * (common * sum_bb - sum_b ** 2))
+        rank_corr = np.where((common >= 2) & (spread > 0), covariance / spread, np.nan)
+    return common, jaccard, rank_corr
+
+
+def _key(run, fields):
+    return tuple(run.get(field) for field in fields)
+
+
+def _stability_row(config, algorithm, members_a, members_b, matrix, common, jaccard, rank_corr):
+    if members_b is None:
+        pairs = [(a, b) for i, a in enumerate(members_a) for b in members_a[i + 1:]]
+        members = members_a
+    else:
+        pairs = [(a, b) for a in members_a for b in members_b]
+        members = members_a + members_b
+    if not pairs:
+        return None
+
+    a, b = np.array(pairs).T
+    sizes = (matrix[members] >= 0).sum(axis=1)
+    # Seeds picked by every run of the group
+    shared = set(matrix[members[0]][matrix[members[0]] >= 0].tolist())
+    for member in members[1:]:
+        shared &= set(matrix[member][matrix[member] >= 0].tolist())
+
+    row = dict(zip(CONFIG_FIELDS, config))
+    row.update({
+        "algorithm": algorithm,
+        "runs": len(members),
+        "pairs": len(pairs),
+        "mean_seeds": round(float(sizes.mean()), 2),
+        "mean_jaccard": round(float(np.nanmean(jaccard[a, b])), 4),
+        "min_jaccard": round(float(np.nanmin(jaccard[a, b])), 4),
+        "mean_rank_corr": (round(float(np.nanmean(rank_corr[a, b])), 4)
+                           if np.isfinite(rank_corr[a, b]).any() else None),
+        "core_fraction": round(len(shared) / sizes.mean(), 4) if sizes.mean() else None,
+    })
+    return row
+
+
+def similarity_tables(runs, matrix):
+    """(pair rows, stability rows) for all runs, comparing seeds only within a dataset."""
+    pair_rows, stability_rows = [], []
+    datasets = sorted({run.get("dataset") or "" for run in runs})
+    for dataset in datasets:
+        members = [i for i, run in enumerate(runs) if (run.get("dataset") or "") == dataset]
+        sub = matrix[members]
+        common, jaccard, rank_corr = pairwise(sub)
+        sub_runs = [runs[i] for i in members]
+
+        for a in range(len(sub_runs)):
+            for b in range(a + 1, len(sub_runs)):
+                pair_rows.append({
+                    "file_a": sub_runs[a]["seed_file"],
+                    "file_b": sub_runs[b]["seed_file"],
+                    "common": int(common[a, b]),
+                    "jaccard": round(float(jaccard[a, b]), 4),
+                    "rank_corr": None if np.isnan(rank_corr[a, b]) else round(float(rank_corr[a, b]), 4),
+                })
+
+        groups = {}
+        for index, run in enumerate(sub_runs):
+            groups.setdefault(_key(run, CONFIG_FIELDS), {}).setdefault(run["algorithm"], []).append(index)
+        for config in sorted(groups, key=lambda key: tuple((value is None, value) for value in key)):
+            by_algorithm = groups[config]
+            candidates = [(algorithm, by_algorithm[algorithm], None) for algorithm in sorted(by_algorithm)]
+            if "1D" in by_algorithm and "2D" in by_algorithm:
+                candidates.append(("1D-2D", by_algorithm["1D"], by_algorithm["2D"]))
+            for algorithm, members_a, members_b in candidates:
+                row = _stability_row(config, algorithm, members_a, members_b, sub, common, jaccard, rank_corr)
+                if row is not None:
+                    stability_rows.append(row)
+    return pair_rows, stability_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the seed sets of IMM runs across repetitions and configurations.")
+    parser.add_argument("roots", nargs="+", help="directories to search for log_*.txt / inf_*.txt files")
+    parser.add_argument("-o", "--output", default="stability.csv", help="per-configuration stability CSV")
+    parser.add_argument("--pairs", help="also write every pairwise comparison to this CSV")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes for parsing logs (default: number of CPUs)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="reparse every log instead of using the .parse_cache.sqlite sidecars")
+    args = parser.parse_args(argv)
+
+    runs, matrix = load_seed_matrix(args.roots, args.workers, use_cache=not args.no_cache)
+    pair_rows, stability_rows = similarity_tables(runs, matrix)
+    write_csv(stability_rows, args.output, fields=STABILITY_FIELDS)
+    print(f"Compared {len(runs)} seed sets: {len(stability_rows)} groups written to {args.output}")
+    if args.pairs:
+        write_csv(pair_rows, args.pairs, fields=PAIR_FIELDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from imm_tools.store import DEFAULT_STORE, read_runs
+
+# 1D-vs-2D speedup with bootstrap confidence intervals and permutation tests.
+#
+# Usage (from the repository root, after ingesting into results.parquet):
+#   python -m imm_tools.speedup -o speedup.csv
+#
+# Runs are grouped by configuration (campaign, dataset and the swept
+# parameter: cores, k or eps). For every group the speedup is
+# mean(1D time) / mean(2D time); its confidence interval comes from a
+# percentile bootstrap and its p-value from a permutation test of the log
+# ratio. Each group's resamples are drawn as one index matrix, and groups are
+# spread over a process pool with independent random streams.
+
+CONFIG_FIELDS = ["campaign", "dataset", "cores", "k", "eps"]
+
+SPEEDUP_FIELDS = CONFIG_FIELDS + [
+    "n_1D", "n_2D", "mean_1D", "mean_2D", "speedup", "ci_lower", "ci_upper", "p_value",
+]
+
+
+def speedup_test(times_1d, times_2d, n_boot=10000, n_perm=10000, confidence=0.95, seed=None):
+    """Speedup of 2D over 1D with a bootstrap CI and a permutation p-value.
+
+    Returns (speedup, ci_lower, ci_upper, p_value). The permutation test is
+    two-sided on |log(mean_1D / mean_2D)|, with the usual +1 correction so
+    the p-value is never exactly zero. With a single run on either side
+    there is no spread to resample, so the CI and p-value are NaN, as in
+    stats.group_ci.
+    """
+    rng = np.random.default_rng(seed)
+    a = np.asarray(times_1d, dtype=float)
+    b = np.asarray(times_2d, dtype=float)
+    speedup = a.mean() / b.mean()
+    if len(a) < 2 or len(b) < 2:
+        return speedup, np.nan, np.nan, np.nan
+
+    # Bootstrap: resample both algorithms independently, all resamples at once
+    boot_a = a[rng.integers(0, len(a), size=(n_boot, len(a)))].mean(axis=1)
+    boot_b = b[rng.integers(0, len(b), size=(n_boot, len(b)))].mean(axis=1)
+    alpha = (1 - confidence) / 2
+    ci_lower, ci_upper = np.quantile(boot_a / boot_b, [alpha, 1 - alpha])
+
+    # Permutation: shuffle the pooled samples by argsort of a random matrix
+    pooled = np.concatenate([a, b])
+    order = rng.random((n_perm, len(pooled))).argsort(axis=1)
+    shuffled = pooled[order]
+    permuted = np.abs(np.log(shuffled[:, :len(a)].mean(axis=1) / shuffled[:, len(a):].mean(axis=1)))
+    observed = abs(np.log(speedup))
+    p_value = (1 + np.count_nonzero(permuted >= observed - 1e-12)) / (n_perm + 1)
+
+    return speedup, ci_lower, ci_upper, p_value
+
+
+def _test_chunk(tasks, n_boot, n_perm, confidence):
+    # One work unit: several groups, each with its own SeedSequence
+    rows = []
+    for key, times_1d, times_2d, seed in tasks:
+        speedup, ci_lower, ci_upper, p_value = speedup_test(
+            times_1d, times_2d, n_boot, n_perm, confidence, seed)
+        row = dict(zip(CONFIG_FIELDS, key))
+        row.update({
+            "n_1D": len(times_1d),
+            "n_2D": len(times_2d),
+            "mean_1D": float(np.mean(times_1d)),
+            "mean_2D": float(np.mean(times_2d)),
+            "speedup": speedup,
+            "ci_lower": ci_lower,
+            "ci_upper": ci_upper,
+            "p_value": p_value,
+        })
+        rows.append(row)
+    return rows
+
+
+def speedup_table(df, value="total_time", n_boot=10000, n_perm=10000, confidence=0.95,
+                  seed=None, workers=None, chunksize=8):
+    """Speedup statistics for every configuration with both 1D and 2D runs.
+
+    df is a run table (see imm_tools.ingest) with CONFIG_FIELDS, algorithm and
+    the value column. Returns a DataFrame with SPEEDUP_FIELDS.
+    """
+    df = df.dropna(subset=[value])
+    tasks = []
+    for key, group in df.groupby(CONFIG_FIELDS, dropna=False, sort=True):
+        times_1d = group.loc[group['algorithm'] == '1D', value].to_numpy()
+        times_2d = group.loc[group['algorithm'] == '2D', value].to_numpy()
+        if len(times_1d) and len(times_2d):
+            tasks.append((key, times_1d, times_2d))
+
+    # Independent, reproducible random streams per group
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    tasks = [task + (task_seed,) for task, task_seed in zip(tasks, seeds)]
+    chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+
+    test = partial(_test_chunk, n_boot=n_boot, n_perm=n_perm, confidence=confidence)
+    rows = []
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            rows.extend(test(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk_rows in pool.map(test, chunks):
+                rows.extend(chunk_rows)
+
+    return pd.DataFrame(rows, columns=SPEEDUP_FIELDS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="1D vs 2D speedup with bootstrap CIs and permutation p-values.")
+    parser.add_argument("-i", "--input", default=DEFAULT_STORE,
+                        help="ingested run table (.parquet store or ingest CSV)")
+    parser.add_argument("-o", "--output", default="speedup.csv", help="output CSV file")
+    parser.add_argument("--value", default="total_time",
+                        help="time column to compare (e.g. generateRR_time, selectseeds_time)")
+    parser.add_argument("--boot", type=int, default=10000, help="bootstrap resamples per group")
+    parser.add_argument("--perm", type=int, default=10000, help="permutations per group")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    args = parser.parse_args(argv)
+
+    df = read_runs(args.input, columns=CONFIG_FIELDS + ["algorithm", args.value])
+    table = speedup_table(df, args.value, args.boot, args.perm, args.confidence,
+                          args.seed, args.workers)
+    table.to_csv(args.output, index=False)
+    print(f"Wrote {len(table)} configurations to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
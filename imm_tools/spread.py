@@ -0,0 +1,203 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from imm_tools.graph import load_graph
+from imm_tools.ingest import write_csv
+from imm_tools.logparse import parse_filename
+from imm_tools.rrsets import cumulative_weights
+from imm_tools.stats import t_interval
+
+# Monte Carlo estimate of the LT influence spread of seed sets.
+#
+# Usage (from the repository root):
+#   python -m imm_tools.spread input_files/com-dblp.ungraph-LT.txt \
+#       figures6&13/com-DBLP/results/inf_*.txt -n 10000 -o spread.csv
+#
+# LT is simulated through its live-edge form: every node keeps at most one
+# in-edge, u -> v with probability w(u, v), and the activated nodes are those
+# reachable from the seeds over kept edges. A node's kept edge is drawn only
+# when a frontier reaches it, so a simulation costs in proportion to
+# the nodes it touches. Many simulations advance together: the frontier is a
+# flat list of (simulation, node) pairs and each step expands all of them
+# with array operations. A node's kept edge is not stored but recomputed from
+# a hash of (simulation, node) whenever it is needed, so the only per-batch
+# state is one bit per simulation and node, and thousands of simulations
+# fit in a batch on graphs of about a million nodes. Simulations are spread
+# over a process pool with independent random streams.
+
+SPREAD_FIELDS = [
+    "file", "campaign", "algorithm", "cores", "k", "eps", "repetition",
+    "seeds", "simulations", "spread_mean", "spread_std", "ci_lower", "ci_upper",
+]
+
+# Simulations advanced together per batch, and the largest batch state (a
+# bit per simulation and node, 128 MiB) the default batch is cut down to
+DEFAULT_BATCH = 4096
+MAX_BATCH_BITS = 2 ** 30
+
+
+def read_seeds(path, num_nodes=None):
+    """Node ids of an inf_*.txt file, in file order without repeats.
+
+    The ranks write their seeds into the file at fixed offsets, so many files
+    have runs of NUL bytes between ids (treated as separators) and a few ids
+    overwritten into one another. Those cannot be split again; with num_nodes
+    given, tokens that are not valid node ids are dropped.
+    """
+    with open(path, 'rb') as file:
+        tokens = file.read().replace(b'\0', b' ').split()
+    limit = num_nodes if num_nodes is not None else 2 ** 63
+    values = [int(token) for token in tokens if token.isdigit()]
+    seeds = np.array([value for value in values if value < limit], dtype=np.int64)
+    _, first = np.unique(seeds, return_index=True)
+    return seeds[np.sort(first)]
+
+
+def forward_graph(graph):
+    """(offsets, targets): out-neighbours of u are targets[offsets[u]:offsets[u + 1]]."""
+    n = graph.num_nodes
+    edge_targets = np.repeat(np.arange(n, dtype=np.int32), graph.in_degree())
+    order = np.argsort(graph.sources, kind='stable')
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(graph.sources, minlength=n), out=offsets[1:])
+    return offsets, edge_targets[order]
+
+
+def _uniform(keys, salt):
+    # Uniform [0, 1) numbers that are a fixed function of (key, salt): the
+    # splitmix64 finalizer over the 64-bit keys
+    x = keys.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) + salt
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+def _simulate_batch(graph, base, cum, forward, seeds, size, rng):
+    # Activated-node count of `size` simulations from the same seeds, with
+    # cells keyed simulation * n + node. A cell's kept in-edge is not stored:
+    # its uniform draw is a hash of the key and a per-batch salt, so it is
+    # recomputed identically whenever a frontier reaches the cell. The only
+    # state is a packed bitset of active cells (size * n bits)
+    n = graph.num_nodes
+    forward_offsets, forward_targets = forward
+    salt = rng.integers(0, 2 ** 63, dtype=np.uint64)
+    active = np.zeros((size * n + 7) // 8, dtype=np.uint8)
+
+    sims = np.repeat(np.arange(size, dtype=np.int64), len(seeds))
+    nodes = np.tile(seeds, size)
+    key = sims * n + nodes
+    activated = [key]
+
+    while len(key):
+        np.bitwise_or.at(active, key >> 3, np.left_shift(1, key & 7).astype(np.uint8))
+        # Every out-edge of every frontier node
+        degree = forward_offsets[nodes + 1] - forward_offsets[nodes]
+        owner = np.repeat(np.arange(len(nodes)), degree)
+        within = np.arange(len(owner)) - np.repeat(np.cumsum(degree) - degree, degree)
+        v = forward_targets[forward_offsets[nodes][owner] + within]
+        u = nodes[owner]
+        key = sims[owner] * n + v
+        fresh = ((active[key >> 3] >> (key & 7).astype(np.uint8)) & 1) == 0
+        u, v, key = u[fresh], v[fresh], key[fresh]
+
+        # v activates exactly when the node its kept edge comes from does
+        edge = np.searchsorted(cum, base[v] + _uniform(key, salt), side='right')
+        kept = edge < graph.offsets[v + 1]
+        key = np.unique(key[kept & (graph.sources[np.minimum(edge, len(cum) - 1)] == u)])
+        activated.append(key)
+        sims, nodes = key // n, key % n
+
+    return np.bincount(np.concatenate(activated) // n, minlength=size)
+
+
+def _simulate_chunk(task):
+    # Worker: `count` simulations of every seed set with one random stream
+    graph_path, undirected, weighted, seed_sets, count, seed, batch = task
+    graph = load_graph(graph_path, undirected, weighted)
+    base, cum = cumulative_weights(graph)
+    forward = forward_graph(graph)
+    rng = np.random.default_rng(seed)
+    if batch is None:
+        batch = max(1, min(DEFAULT_BATCH, MAX_BATCH_BITS // max(graph.num_nodes, 1)))
+
+    results = []
+    for seeds in seed_sets:
+        spreads = [
+            _simulate_batch(graph, base, cum, forward, seeds, min(batch, count - start), rng)
+            for start in range(0, count, batch)
+        ]
+        results.append(np.concatenate(spreads) if spreads else np.empty(0, dtype=np.int64))
+    return results
+
+
+def estimate_spread(graph_path, seed_sets, simulations=10000, workers=None, seed=None,
+                    undirected=True, weighted=True, batch=None):
+    """Spread of each seed set in `simulations` LT simulations; one int array per set."""
+    workers = workers or os.cpu_count() or 1
+    shares = [simulations // workers + (w < simulations % workers) for w in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    tasks = [(graph_path, undirected, weighted, seed_sets, share, task_seed, batch)
+             for share, task_seed in zip(shares, seeds) if share]
+
+    if len(tasks) <= 1:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+    return [np.concatenate([chunk[i] for chunk in chunks]) for i in range(len(seed_sets))]
+
+
+def spread_rows(paths, seed_sets, spreads, confidence=0.95):
+    """SPREAD_FIELDS rows: run parameters from the seed file name plus spread statistics."""
+    rows = []
+    for path, seeds, values in zip(paths, seed_sets, spreads):
+        row = {"file": path}
+        row.update(parse_filename(path) or {})
+        mean = values.mean()
+        std = values.std(ddof=1) if len(values) > 1 else float('nan')
+        lower, upper = t_interval(mean, std, len(values), confidence)
+        row.update({
+            "seeds": len(seeds),
+            "simulations": len(values),
+            "spread_mean": round(float(mean), 3),
+            "spread_std": round(float(std), 3),
+            "ci_lower": round(float(lower), 3),
+            "ci_upper": round(float(upper), 3),
+        })
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo LT influence spread of inf_*.txt seed sets.")
+    parser.add_argument("graph", help="*-LT.txt edge list the seeds were selected on")
+    parser.add_argument("seed_files", nargs="+", help="inf_*.txt files")
+    parser.add_argument("-n", "--simulations", type=int, default=10000, help="simulations per seed set")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--batch", type=int, default=None,
+                        help="simulations advanced together by one worker (default: up to "
+                             f"{DEFAULT_BATCH}, within a {MAX_BATCH_BITS // 2 ** 23} MiB state)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--directed", action="store_true", help="do not add reverse edges (no -u)")
+    parser.add_argument("--unweighted", action="store_true", help="use 1/indegree weights (no -w)")
+    parser.add_argument("-o", "--output", default="spread.csv", help="output CSV file")
+    args = parser.parse_args(argv)
+
+    graph = load_graph(args.graph, not args.directed, not args.unweighted)
+    seed_sets = [read_seeds(path, graph.num_nodes) for path in args.seed_files]
+    spreads = estimate_spread(args.graph, seed_sets, args.simulations, args.workers, args.seed,
+                              not args.directed, not args.unweighted, args.batch)
+    rows = spread_rows(args.seed_files, seed_sets, spreads)
+    for row in rows:
+        print(f"{row['file']}: {row['spread_mean']:.1f} "
+              f"[{row['ci_lower']:.1f}, {row['ci_upper']:.1f}]")
+    write_csv(rows, args.output, fields=SPREAD_FIELDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import os
+import sys
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # the CSV fallback in load_results still works without pyarrow
+    pa = None
+    pq = None
+
+# Typed columnar results store.
+#
+# All ingested runs live in one Parquet file at the repository root
+# (results.parquet, written by `python -m imm_tools.ingest ... -o results.parquet`).
+# The low-cardinality string columns are dictionary encoded, and the plot
+# scripts read only the columns and rows they need through load_results, so
+# pyarrow can skip whole row groups instead of pandas re-parsing text CSVs.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE = os.path.join(REPO_ROOT, "results.parquet")
+
+
+def repo_path(path):
+    """path relative to the repository root if it lies inside it, else absolute.
+
+    Used for the store's source column, so a run is named the same whatever
+    the working directory or the spelling of the path it was ingested from.
+    """
+    path = os.path.abspath(path)
+    relative = os.path.relpath(path, REPO_ROOT)
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return path
+    return relative.replace(os.sep, "/")
+
+# Column names used by the per-figure CSVs -> store column names
+LEGACY_COLUMNS = {
+    "total time": "total_time",
+    "generateRR time": "generateRR_time",
+    "selectseeds time": "selectseeds_time",
+}
+
+
+def run_schema():
+    """Schema of the run-level table written by imm_tools.ingest."""
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("source", dict_string),
+        ("file", pa.string()),
+        ("campaign", dict_string),
+        ("dataset", dict_string),
+        ("algorithm", dict_string),
+        ("nodes", pa.int32()),
+        ("cores", pa.int32()),
+        ("k", pa.int32()),
+        ("eps", pa.float64()),
+        ("repetition", pa.int32()),
+        ("graph_nodes", pa.int64()),
+        ("graph_edges", pa.int64()),
+        ("avg_degree", pa.float64()),
+        ("max_degree", pa.int32()),
+        ("rounds", pa.int32()),
+        ("theta_final_pe", pa.int64()),
+        ("rrsets_total_pe", pa.int64()),
+        ("final_generateRR_time", pa.float64()),
+        ("final_selectseeds_time", pa.float64()),
+        ("coverage", pa.float64()),
+        ("matrixGen_time", pa.float64()),
+        ("kloops_time", pa.float64()),
+        ("total_time", pa.float64()),
+        ("generateRR_time", pa.float64()),
+        ("selectseeds_time", pa.float64()),
+    ])
+
+
+def round_schema():
+    """Schema of the per-round table written by imm_tools.timeline."""
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("run_id", pa.string()),
+        ("campaign", dict_string),
+        ("dataset", dict_string),
+        ("algorithm", dict_string),
+        ("cores", pa.int32()),
+        ("k", pa.int32()),
+        ("eps", pa.float64()),
+        ("repetition", pa.int32()),
+        ("round", pa.int32()),
+        ("delta_pe", pa.int64()),
+        ("rr_time", pa.float64()),
+        ("select_time", pa.float64()),
+        ("round_time", pa.float64()),
+        ("round_share", pa.float64()),
+        ("matrixGen_time", pa.float64()),
+        ("matrixGen_round", pa.float64()),
+        ("kloops_time", pa.float64()),
+        ("kloops_round", pa.float64()),
+        ("coverage", pa.float64()),
+    ])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("the Parquet results store needs pyarrow (pip install pyarrow)")
+
+
+def write_store(rows, path=DEFAULT_STORE, schema=None):
+    """Write row dicts (e.g. from imm_tools.ingest.ingest) to a Parquet file."""
+    _require_pyarrow()
+    schema = schema or run_schema()
+    # Sorting by the usual filter keys keeps row-group statistics selective
+    rows = sorted(rows, key=lambda row: tuple(str(row.get(key) or "")
+                                              for key in ("campaign", "dataset", "algorithm")))
+    columns = {field.name: [row.get(field.name) for row in rows] for field in schema}
+    table = pa.Table.from_pydict(columns, schema=schema)
+    pq.write_table(table, path, row_group_size=4096)
+
+
+def read_store(path=DEFAULT_STORE, columns=None, filters=None):
+    """Read a Parquet store into a DataFrame with column projection and row filters.
+
+    filters uses the pyarrow DNF syntax, e.g.
+    [("dataset", "==", "com-dblp"), ("algorithm", "in", ["1D", "2D"])].
+    """
+    _require_pyarrow()
+    table = pq.read_table(path, columns=columns, filters=filters)
+    df = table.to_pandas()
+    # Integer columns with nulls come back as float; once the filters have
+    # removed the nulls (e.g. cores within the scaling campaign) restore ints
+    for field in table.schema:
+        if pa.types.is_integer(field.type) and not df[field.name].isna().any():
+            df[field.name] = df[field.name].astype("int64")
+    return df
+
+
+def _plain_strings(df):
+    # Dictionary columns arrive as categoricals; plain strings are easier to
+    # group, compare and plot with
+    for column in df.columns:
+        if str(df[column].dtype) == "category":
+            df[column] = df[column].astype(str)
+    return df
+
+
+def _apply_filters(df, filters):
+    # Same semantics as the pyarrow filters for the operators the scripts use;
+    # filters on columns the CSV does not have (campaign, dataset) are skipped
+    for column, op, value in filters or []:
+        if column not in df.columns:
+            continue
+        if op == "==":
+            df = df[df[column] == value]
+        elif op == "!=":
+            df = df[df[column] != value]
+        elif op == "in":
+            df = df[df[column].isin(value)]
+        elif op == "<":
+            df = df[df[column] < value]
+        elif op == "<=":
+            df = df[df[column] <= value]
+        elif op == ">":
+            df = df[df[column] > value]
+        elif op == ">=":
+            df = df[df[column] >= value]
+        else:
+            raise ValueError(f"unsupported filter operator: {op}")
+    return df
+
+
+def load_results(columns, filters=None, fallback_csv=None, store=DEFAULT_STORE):
+    """Load the rows a plot needs, from the Parquet store if it exists.
+
+    Without a store (or without pyarrow), when the store has no rows
+    matching the filters (it was ingested from part of the tree only), or
+    when fallback_csv is newer than the store (parse_results.py was rerun
+    after the last ingest), the per-figure fallback_csv is read instead,
+    its legacy column names are mapped to the store names, and the same
+    filters are applied in pandas.
+    """
+    # Imported here so ingesting (which only writes the store) needs no pandas
+    import pandas as pd
+
+    stale = (fallback_csv is not None and os.path.exists(fallback_csv) and os.path.exists(store)
+             and os.path.getmtime(fallback_csv) > os.path.getmtime(store))
+    if stale:
+        sys.stderr.write(f"warning: {fallback_csv} is newer than {store}; reading the CSV "
+                         "(re-run imm_tools.ingest to update the store)\n")
+    elif pa is not None and os.path.exists(store):
+        df = _plain_strings(read_store(store, columns=columns, filters=filters))
+        if not df.empty:
+            return df
+        if fallback_csv is None:
+            raise ValueError(f"results store '{store}' has no rows matching {filters}; "
+                             "ingest the figure's results directory into it")
+    elif fallback_csv is None:
+        raise FileNotFoundError(f"results store '{store}' not found and no fallback CSV given")
+
+    df = pd.read_csv(fallback_csv).rename(columns=LEGACY_COLUMNS)
+    df = _apply_filters(df, filters)
+    return df[[column for column in columns if column in df.columns]]
+
+
+def read_runs(path=DEFAULT_STORE, columns=None, filters=None):
+    """Read an ingested run table, either the Parquet store or an ingest CSV.
+
+    Both carry the same column names, so the analysis modules can take either.
+    """
+    if path.endswith(".parquet"):
+        return _plain_strings(read_store(path, columns=columns, filters=filters))
+
+    import pandas as pd
+
+    df = _apply_filters(pd.read_csv(path), filters)
+    return df[columns] if columns is not None else df
@@ -0,0 +1,406 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import subprocess
+import time
+
+from imm_tools.journal import Journal
+from imm_tools.logparse import parse_log
+from imm_tools.stats import t_interval
+
+# Sweep scheduler replacing the srun loops of run.sh / run_scaling_k.sh /
+# run_eps.sh.
+#
+# Usage (from the repository root, inside the Slurm allocation):
+#   python -m imm_tools.sweep scaling_dblp
+#   python -m imm_tools.sweep --grid my_sweep.json --dry-run
+#   python -m imm_tools.sweep k_youtube --launcher local --stand-in ./fake_imm.sh
+#
+# A sweep is a declarative parameter grid (see PRESETS). It is expanded into
+# one cell per (algorithm, cores, k, eps, repetition), and the scheduler packs
+# cells onto the allocation's nodes: runs of up to one node's worth of cores
+# share a node side by side (first fit on free cores), larger runs take whole
+# free nodes. Each cell is started through a launcher, so srun can be swapped
+# for a plain local subprocess when testing.
+#
+# Nothing is deleted before a sweep: finished runs are recorded in the
+# completion journal (see imm_tools.journal) and relaunching the same sweep
+# only starts the runs that are missing or failed.
+#
+# With --adaptive the repetition count is not fixed: every configuration
+# starts with --min-reps runs and gets more only while the 95% confidence
+# interval of its total time is wider than the target.
+
+IMM_ROOT = "/scratch/ipopa/repro/imm_hclib"
+BINARIES = {
+    "1D": f"{IMM_ROOT}/src/lt_1D/production",
+    "2D": f"{IMM_ROOT}/src/lt_2D/production_2D",
+}
+INPUTS = {
+    "com-dblp": f"{IMM_ROOT}/input_files/com-dblp.ungraph-LT.txt",
+    "com-youtube": f"{IMM_ROOT}/input_files/com-youtube.ungraph-LT.txt",
+    "soc-Epinions1": f"{IMM_ROOT}/input_files/soc-Epinions1-LT.txt",
+}
+NODES = ["parmi1", "parmi2", "parmi3", "parmi"]
+CORES_PER_NODE = 192
+
+
+def _preset(campaign, dataset, output_dir, **grid):
+    sweep = {
+        "campaign": campaign,
+        "dataset": dataset,
+        "input": INPUTS[dataset],
+        "output_dir": output_dir,
+        "algorithms": ["1D", "2D"],
+        "binaries": BINARIES,
+        "nodes": NODES,
+        "cores_per_node": CORES_PER_NODE,
+        "cores": [len(NODES) * CORES_PER_NODE],
+        "k": [100],
+        "eps": [0.13],
+        "reps": 5,
+    }
+    sweep.update(grid)
+    return sweep
+
+
+# The grids of the existing run scripts
+PRESETS = {
+    "scaling_dblp": _preset("scaling", "com-dblp", "figures6&13/com-DBLP/results",
+                            cores=[24, 48, 96, 192, 384, 576, 768]),
+    "scaling_youtube": _preset("scaling", "com-youtube", "figures6&13/youtube/results",
+                               cores=[24, 48, 96, 192, 384, 576, 768]),
+    "scaling_epinions": _preset("scaling", "soc-Epinions1", "figures6&13/soc-Epinions/results",
+                                cores=[24, 48, 96, 192, 384, 576, 768]),
+    "k_dblp": _preset("k", "com-dblp", "figure8/DBLP/results", k=[64, 128, 256, 512, 1024]),
+    "k_youtube": _preset("k", "com-youtube", "figure8/youtube/results", k=[64, 128, 256, 512, 1024]),
+    "eps_dblp": _preset("eps", "com-dblp", "figure10/dblp/results",
+                        eps=[0.1, 0.2, 0.3, 0.4, 0.5], reps=1),
+    "eps_youtube": _preset("eps", "com-youtube", "figure10/youtube/results",
+                           eps=[0.1, 0.2, 0.3, 0.4, 0.5], reps=1),
+}
+
+
+def node_count(cores, cores_per_node):
+    return math.ceil(cores / cores_per_node)
+
+
+def run_name(campaign, cell):
+    """File name stem of a cell, following the campaign's existing convention."""
+    algorithm, rep = cell["algorithm"], cell["rep"]
+    if campaign == "scaling":
+        return f"{cell['nodes']}n_{cell['cores']}c_{algorithm}_r{rep}"
+    if campaign == "k":
+        return f"k{cell['k']}_{algorithm}_r{rep}"
+    if campaign == "eps":
+        return f"k{cell['k']}_{algorithm}_e{cell['eps']}_r{rep}"
+    raise ValueError(f"unknown campaign: {campaign}")
+
+
+def make_cell(sweep, algorithm, cores, k, eps, rep):
+    cell = {
+        "dataset": sweep["dataset"],
+        "algorithm": algorithm,
+        "cores": cores,
+        "nodes": node_count(cores, sweep["cores_per_node"]),
+        "k": k,
+        "eps": eps,
+        "rep": rep,
+    }
+    cell["name"] = run_name(sweep["campaign"], cell)
+    return cell
+
+
+def expand(sweep, reps=None):
+    """Cells of a sweep in the order the run scripts used (repetition, then 1D/2D)."""
+    reps = reps or range(1, sweep["reps"] + 1)
+    return [
+        make_cell(sweep, algorithm, cores, k, eps, rep)
+        for cores, k, eps, rep, algorithm in itertools.product(
+            sweep["cores"], sweep["k"], sweep["eps"], reps, sweep["algorithms"])
+    ]
+
+
+def imm_arguments(sweep, cell):
+    """Command-line arguments of production/production_2D for a cell."""
+    name = cell["name"]
+    return [
+        "-f", sweep["input"], "-u", "-w",
+        "-o", f"inf_{name}.txt",
+        "-t", f"time_{name}.txt",
+        "-e", str(cell["eps"]), "-c", "-k", str(cell["k"]),
+    ]
+
+
+class Launcher:
+    """Starts one cell as a subprocess writing log_<name>.txt in the output directory."""
+
+    def command(self, sweep, cell, nodelist):
+        raise NotImplementedError
+
+    def environment(self, cell, nodelist):
+        return None
+
+    def start(self, sweep, cell, nodelist):
+        workdir = sweep["output_dir"]
+        log_file = open(os.path.join(workdir, f"log_{cell['name']}.txt"), 'w')
+        try:
+            return subprocess.Popen(self.command(sweep, cell, nodelist), cwd=workdir,
+                                    env=self.environment(cell, nodelist),
+                                    stdout=log_file, stderr=subprocess.STDOUT)
+        finally:
+            # The child keeps its own handle
+            log_file.close()
+
+
+class SrunLauncher(Launcher):
+    """srun job step on the given nodes, as in the run scripts."""
+
+    def command(self, sweep, cell, nodelist):
+        return [
+            "srun", "-N", str(len(nodelist)), f"--nodelist={','.join(nodelist)}",
+            "-n", str(cell["cores"]), f"--ntasks-per-node={cell['cores'] // len(nodelist)}",
+            "--exclusive",
+            sweep["binaries"][cell["algorithm"]],
+        ] + imm_arguments(sweep, cell)
+
+
+class LocalLauncher(Launcher):
+    """Run the binary (or a stand-in program) directly, without Slurm.
+
+    The stand-in receives the same IMM arguments; the cell's cores and nodes
+    are passed in IMM_CORES / IMM_NODELIST for programs that want them.
+    """
+
+    def __init__(self, stand_in=None):
+        self.stand_in = stand_in
+
+    def command(self, sweep, cell, nodelist):
+        program = self.stand_in or sweep["binaries"][cell["algorithm"]]
+        return [program] + imm_arguments(sweep, cell)
+
+    def environment(self, cell, nodelist):
+        return dict(os.environ, IMM_CORES=str(cell["cores"]), IMM_NODELIST=",".join(nodelist))
+
+
+class NodePool:
+    """Free cores per node of the allocation."""
+
+    def __init__(self, nodes, cores_per_node, pack=True):
+        self.cores_per_node = cores_per_node
+        self.pack = pack
+        self.free = {node: cores_per_node for node in nodes}
+
+    def acquire(self, cores):
+        """Reserve nodes for a run of this size; returns the node list or None."""
+        needed = node_count(cores, self.cores_per_node)
+        if needed == 1 and self.pack:
+            # First fit: share a node with other small runs if it has room
+            for node, free in self.free.items():
+                if free >= cores:
+                    self.free[node] -= cores
+                    return [node]
+            return None
+
+        idle = [node for node, free in self.free.items() if free == self.cores_per_node]
+        if len(idle) < needed:
+            return None
+        nodelist = idle[:needed]
+        for node in nodelist:
+            self.free[node] = 0
+        return nodelist
+
+    def release(self, nodelist, cores):
+        if len(nodelist) == 1 and self.pack:
+            self.free[nodelist[0]] += cores
+        else:
+            for node in nodelist:
+                self.free[node] = self.cores_per_node
+
+
+def schedule(sweep, cells, launcher, pack=True, poll=1.0, on_finish=None, log=print):
+    """Run cells concurrently on the sweep's nodes until all have finished.
+
+    Cells are started in order; whenever a cell does not fit on the free
+    nodes, later cells that do fit are started in its place (backfill).
+    on_finish(cell, returncode) is called as each run completes. Returns a
+    list of (cell, returncode) in completion order.
+    """
+    pool = NodePool(sweep["nodes"], sweep["cores_per_node"], pack)
+    too_big = [cell for cell in cells if cell["nodes"] > len(sweep["nodes"])]
+    if too_big:
+        raise ValueError(f"{too_big[0]['name']} needs {too_big[0]['nodes']} nodes, "
+                         f"the sweep has {len(sweep['nodes'])}")
+
+    os.makedirs(sweep["output_dir"], exist_ok=True)
+    pending = list(cells)
+    running = []
+    finished = []
+
+    while pending or running:
+        for cell in list(pending):
+            nodelist = pool.acquire(cell["cores"])
+            if nodelist is None:
+                continue
+            log(f">>> {cell['name']} on {','.join(nodelist)}")
+            running.append((cell, nodelist, launcher.start(sweep, cell, nodelist)))
+            pending.remove(cell)
+
+        time.sleep(poll if running else 0)
+        for item in list(running):
+            cell, nodelist, process = item
+            returncode = process.poll()
+            if returncode is None:
+                continue
+            running.remove(item)
+            pool.release(nodelist, cell["cores"])
+            finished.append((cell, returncode))
+            log(f"<<< {cell['name']} exited with {returncode}")
+            if on_finish is not None:
+                on_finish(cell, returncode)
+
+    return finished
+
+
+def run_sweep(sweep, cells, launcher, pack=True, poll=1.0, resume=True, log=print):
+    """Schedule the cells not yet journaled as done and journal each outcome.
+
+    With resume=False every cell is run again. Returns the journal entries of
+    the runs started by this call.
+    """
+    os.makedirs(sweep["output_dir"], exist_ok=True)
+    journal = Journal(sweep["output_dir"])
+    todo = journal.pending(cells) if resume else list(cells)
+    log(f"{len(cells) - len(todo)} of {len(cells)} runs already done")
+
+    entries = []
+
+    def finish(cell, returncode):
+        entry = journal.finish(cell, returncode)
+        if entry["status"] != "done":
+            reason = f"exit {returncode}" if returncode else "no Total Time line in the log"
+            log(f"!!! {cell['name']} failed: {reason}")
+        entries.append(entry)
+
+    schedule(sweep, todo, launcher, pack, poll, on_finish=finish, log=log)
+    return entries
+
+
+def relative_ci_width(times, confidence=0.95):
+    """Width of the t confidence interval of the mean relative to the mean (inf below 2 runs)."""
+    if len(times) < 2:
+        return math.inf
+    mean = sum(times) / len(times)
+    std = math.sqrt(sum((t - mean) ** 2 for t in times) / (len(times) - 1))
+    lower, upper = t_interval(mean, std, len(times), confidence)
+    return float((upper - lower) / mean)
+
+
+def config_key(cell):
+    return (cell["algorithm"], cell["cores"], cell["k"], cell["eps"])
+
+
+def adaptive_sweep(sweep, launcher, target=0.05, min_reps=3, max_reps=10, confidence=0.95,
+                   pack=True, poll=1.0, resume=True, log=print):
+    """Repeat every configuration until its total time CI is narrow enough.
+
+    Each round runs the repetitions still owed by all open configurations
+    together, so they are packed like a regular sweep. A configuration is
+    closed once (ci_upper - ci_lower) / mean <= target or max_reps runs are
+    done; otherwise the next round asks for the repetition count that the
+    current spread predicts is enough (CI width shrinks with sqrt(n)), at
+    least one more. Returns {config_key: (completed runs, relative width)}.
+    """
+    reps = {config_key(cell): min_reps for cell in expand(sweep, reps=[1])}
+    result = {}
+    while reps:
+        cells = [make_cell(sweep, algorithm, cores, k, eps, rep)
+                 for (algorithm, cores, k, eps), count in reps.items()
+                 for rep in range(1, count + 1)]
+        run_sweep(sweep, cells, launcher, pack, poll, resume=resume, log=log)
+        # Only the first round may rerun finished cells
+        resume = True
+
+        times = {key: [] for key in reps}
+        for cell in cells:
+            run, _ = parse_log(os.path.join(sweep["output_dir"], f"log_{cell['name']}.txt"))
+            if run.get("total_time") is not None:
+                times[config_key(cell)].append(run["total_time"])
+
+        for key, count in list(reps.items()):
+            width = relative_ci_width(times[key], confidence)
+            if width <= target or count >= max_reps:
+                result[key] = (len(times[key]), width)
+                del reps[key]
+                algorithm, cores, k, eps = key
+                log(f"=== {algorithm} {cores}c k={k} eps={eps}: {len(times[key])} runs, "
+                    f"CI width {width:.1%}")
+            else:
+                needed = math.ceil(count * (width / target) ** 2) if math.isfinite(width) else count + 1
+                reps[key] = min(max(needed, count + 1), max_reps)
+    return result
+
+
+def load_sweep(name=None, grid_file=None):
+    """A preset by name, or a JSON grid (missing keys fall back to the defaults)."""
+    if grid_file is None:
+        return dict(PRESETS[name])
+    with open(grid_file) as file:
+        grid = json.load(file)
+    return _preset(grid.pop("campaign"), grid.pop("dataset"), grid.pop("output_dir"), **grid)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run an IMM parameter sweep on the allocation's nodes.")
+    parser.add_argument("preset", nargs="?", choices=sorted(PRESETS),
+                        help="one of the sweeps of the run scripts")
+    parser.add_argument("--grid", help="JSON grid instead of a preset (campaign, dataset, output_dir, ...)")
+    parser.add_argument("--launcher", choices=["srun", "local"], default="srun")
+    parser.add_argument("--stand-in", help="program run by the local launcher instead of the IMM binaries")
+    parser.add_argument("--no-pack", action="store_true",
+                        help="give every run whole nodes instead of sharing nodes between small runs")
+    parser.add_argument("--poll", type=float, default=1.0, help="seconds between completion checks")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="rerun every cell instead of skipping those the journal marks done")
+    parser.add_argument("--adaptive", type=float, metavar="WIDTH",
+                        help="repeat each configuration until its 95%% CI of total time is at most "
+                             "this fraction of the mean (e.g. 0.05) instead of a fixed count")
+    parser.add_argument("--min-reps", type=int, default=3, help="first repetitions with --adaptive")
+    parser.add_argument("--max-reps", type=int, default=10, help="repetition cap with --adaptive")
+    parser.add_argument("--dry-run", action="store_true", help="print the cells that would run and exit")
+    args = parser.parse_args(argv)
+
+    if (args.preset is None) == (args.grid is None):
+        parser.error("give exactly one of a preset or --grid")
+    if args.adaptive is not None and not 2 <= args.min_reps <= args.max_reps:
+        parser.error("--adaptive needs 2 <= --min-reps <= --max-reps")
+
+    sweep = load_sweep(args.preset, args.grid)
+    cells = expand(sweep)
+    if args.dry_run:
+        journal = Journal(sweep["output_dir"])
+        for cell in cells if args.no_resume else journal.pending(cells, adopt=False):
+            print(cell["name"])
+        return
+
+    launcher = SrunLauncher() if args.launcher == "srun" else LocalLauncher(args.stand_in)
+    if args.adaptive is not None:
+        result = adaptive_sweep(sweep, launcher, args.adaptive, args.min_reps, args.max_reps,
+                                pack=not args.no_pack, poll=args.poll, resume=not args.no_resume)
+        wide = [key for key, (_, width) in result.items() if width > args.adaptive]
+        print(f"{len(result) - len(wide)} configurations converged, "
+              f"{len(wide)} stopped at {args.max_reps} repetitions")
+        return
+
+    entries = run_sweep(sweep, cells, launcher, pack=not args.no_pack, poll=args.poll,
+                        resume=not args.no_resume)
+    failed = [entry["name"] for entry in entries if entry["status"] != "done"]
+    print(f"{len(entries) - len(failed)} runs succeeded, {len(failed)} failed")
+    if failed:
+        print("Relaunch the same sweep to retry: " + " ".join(failed))
+
+
+if __name__ == "__main__":
+    main()
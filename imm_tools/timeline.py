@@ -0,0 +1,127 @@
+import argparse
+
+from imm_tools.ingest import DEFAULT_CHUNKSIZE, ingest_runs, write_csv
+from imm_tools.store import round_schema, write_store
+
+# Per-round timeline of the IMM martingale (STEP 1 sampling) loop.
+#
+# Usage (from the repository root):
+#   python -m imm_tools.timeline figure8 figure10 "figures6&13" -o rounds.csv
+#
+# Each Delta/PE block of a log becomes one row. The log reports RR generation
+# and seed selection time per round, but matrixGen and k loops (2D only) as
+# running totals, so their per-round increments are derived here as well.
+
+# Identification of the run a round belongs to
+RUN_KEY_FIELDS = [
+    "run_id", "campaign", "dataset", "algorithm", "cores", "k", "eps", "repetition",
+]
+
+TIMELINE_FIELDS = RUN_KEY_FIELDS + [
+    "round", "delta_pe", "rr_time", "select_time", "round_time", "round_share",
+    "matrixGen_time", "matrixGen_round", "kloops_time", "kloops_round", "coverage",
+]
+
+
+def run_id(run):
+    """Stable identifier of a run: its results directory plus log file name."""
+    return f"{run['source']}/{run['file']}"
+
+
+def timeline_rows(run, rounds):
+    """Flatten the sampling rounds of one parsed run into TIMELINE_FIELDS rows.
+
+    round_time is RR generation plus seed selection of the round and
+    round_share its fraction of the whole sampling phase. matrixGen_round and
+    kloops_round are the increments of the cumulative 2D timers.
+    """
+    key = {field: run.get(field) for field in RUN_KEY_FIELDS}
+    key["run_id"] = run_id(run)
+
+    rows = []
+    previous_matrix = 0.0
+    previous_kloops = 0.0
+    for round_ in rounds:
+        row = dict(key)
+        row.update(round_)
+
+        if round_["rr_time"] is not None and round_["select_time"] is not None:
+            row["round_time"] = round(round_["rr_time"] + round_["select_time"], 6)
+        else:
+            row["round_time"] = None
+
+        if round_["matrixGen_time"] is not None:
+            row["matrixGen_round"] = round(round_["matrixGen_time"] - previous_matrix, 6)
+            previous_matrix = round_["matrixGen_time"]
+        else:
+            row["matrixGen_round"] = None
+        if round_["kloops_time"] is not None:
+            row["kloops_round"] = round(round_["kloops_time"] - previous_kloops, 6)
+            previous_kloops = round_["kloops_time"]
+        else:
+            row["kloops_round"] = None
+
+        rows.append(row)
+
+    sampling_time = sum(row["round_time"] for row in rows if row["round_time"] is not None)
+    for row in rows:
+        if row["round_time"] is not None and sampling_time > 0:
+            row["round_share"] = round(row["round_time"] / sampling_time, 6)
+        else:
+            row["round_share"] = None
+    return rows
+
+
+def dominant_round(rows):
+    """The row of the round with the largest round_time, or None."""
+    timed = [row for row in rows if row["round_time"] is not None]
+    if not timed:
+        return None
+    return max(timed, key=lambda row: row["round_time"])
+
+
+def dominant_summary(rows):
+    """One line saying how often the last sampling round is the slowest one."""
+    runs = {}
+    for row in rows:
+        runs.setdefault(row["run_id"], []).append(row)
+    dominant = [(dominant_round(run_rows), run_rows[-1]) for run_rows in runs.values()]
+    dominant = [(row, last) for row, last in dominant if row is not None and row["round_share"] is not None]
+    if not dominant:
+        return "No timed rounds"
+    last = sum(row is final for row, final in dominant)
+    share = sum(row["round_share"] for row, _ in dominant) / len(dominant)
+    return (f"Slowest round is the last one in {last} of {len(dominant)} runs; "
+            f"it takes {share:.0%} of the sampling time on average")
+
+
+def build_timeline(roots, workers=None, chunksize=DEFAULT_CHUNKSIZE, use_cache=True):
+    """Timeline rows for every log below roots, in path and round order."""
+    rows = []
+    for _, run, rounds in ingest_runs(roots, workers, chunksize, use_cache):
+        rows.extend(timeline_rows(run, rounds))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract the per-round sampling timeline from IMM logs.")
+    parser.add_argument("roots", nargs="+", help="directories to search for log_*.txt files")
+    parser.add_argument("-o", "--output", default="rounds.csv",
+                        help="output file; .parquet writes a typed table, anything else CSV")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="reparse every log instead of using the .parse_cache.sqlite sidecars")
+    args = parser.parse_args(argv)
+
+    rows = build_timeline(args.roots, workers=args.workers, use_cache=not args.no_cache)
+    if args.output.endswith(".parquet"):
+        write_store(rows, args.output, schema=round_schema())
+    else:
+        write_csv(rows, args.output, fields=TIMELINE_FIELDS)
+    print(f"Wrote {len(rows)} rounds to {args.output}")
+    print(dominant_summary(rows))
+
+
+if __name__ == "__main__":
+    main()
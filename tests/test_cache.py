@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import pytest
+
+from imm_tools.cache import CACHE_FILE, cached_parse
+from imm_tools.ingest import ingest_runs
+from imm_tools.logparse import parse_log
+
+LOG_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "figure8", "DBLP", "results")
+
+
+@pytest.fixture
+def logs(tmp_path):
+    for name in sorted(name for name in os.listdir(LOG_DIR) if name.startswith("log_"))[:3]:
+        shutil.copy(os.path.join(LOG_DIR, name), tmp_path)
+    return tmp_path
+
+
+def test_cache_is_reused(logs):
+    first = cached_parse(str(logs))
+    assert len(first) == 3
+    assert os.path.exists(logs / CACHE_FILE)
+    assert cached_parse(str(logs)) == first
+
+
+def test_unwritable_cache_falls_back_to_parsing(logs, capsys):
+    # A directory in place of the cache file cannot be opened, even by root
+    os.mkdir(logs / CACHE_FILE)
+    paths = sorted(str(path) for path in logs.glob("log_*.txt"))
+    expected = [parse_log(path) for path in paths]
+    assert len(expected) == 3
+
+    assert cached_parse(str(logs)) == expected
+    parsed = ingest_runs([str(logs)], workers=1)
+    assert [(run, rounds) for _, run, rounds in parsed] == [
+        (dict(run, source=parsed[0][1]["source"]), rounds) for run, rounds in expected]
+    assert "no parse cache" in capsys.readouterr().err
+
+
+@pytest.mark.skipif(os.name != "posix" or os.geteuid() == 0, reason="needs a user bound by permissions")
+def test_read_only_results_dir(logs):
+    logs.chmod(0o555)
+    try:
+        assert len(cached_parse(str(logs))) == len(list(logs.glob("log_*.txt")))
+    finally:
+        logs.chmod(0o755)
@@ -0,0 +1,34 @@
+import os
+
+import pandas as pd
+import pytest
+
+from imm_tools.efficiency import READ_COLUMNS, efficiency_table, main
+
+
+def runs(campaign, cores, totals):
+    return pd.DataFrame({
+        "dataset": "com-dblp", "algorithm": "1D", "campaign": campaign, "cores": cores,
+        "total_time": totals, "generateRR_time": [total / 2 for total in totals],
+        "selectseeds_time": [total / 4 for total in totals],
+        "matrixGen_time": None, "kloops_time": None,
+    })[READ_COLUMNS]
+
+
+def test_efficiency_relative_to_the_smallest_core_count():
+    table = efficiency_table(runs("scaling", [24, 48, 96], [8.0, 4.0, 4.0]))
+    assert table["speedup"].tolist() == [1.0, 2.0, 2.0]
+    assert table["efficiency"].tolist() == [1.0, 1.0, 0.5]
+    assert table["generateRR_share"].tolist() == [0.5, 0.5, 0.5]
+
+
+@pytest.mark.parametrize("campaign", ["k", None])
+def test_report_without_scaling_runs(tmp_path, capsys, campaign):
+    path = tmp_path / "runs.csv"
+    df = runs(campaign, [24], [1.0]) if campaign else runs("scaling", [], [])
+    df.to_csv(path, index=False)
+    report = tmp_path / "report"
+
+    main(["-i", str(path), "-d", str(report)])
+    assert "No scaling runs" in capsys.readouterr().out
+    assert not os.path.exists(report)
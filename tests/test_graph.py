@@ -0,0 +1,25 @@
+import os
+import stat
+
+import numpy as np
+import pytest
+
+from imm_tools.graph import build_reverse_graph, read_csr, write_csr
+
+
+@pytest.fixture
+def umask():
+    previous = os.umask(0o022)
+    yield
+    os.umask(previous)
+
+
+def test_write_csr_replaces_the_copy_with_a_readable_directory(tmp_path, umask):
+    directory = str(tmp_path / "csr")
+    write_csr(build_reverse_graph([0, 1], [1, 2]), directory, {"version": 1})
+    graph = build_reverse_graph([0, 1, 2], [1, 2, 0])
+    write_csr(graph, directory, {"version": 2})
+
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o755
+    assert sorted(os.listdir(tmp_path)) == ["csr"]
+    assert np.array_equal(read_csr(directory).sources, graph.sources)
@@ -0,0 +1,79 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from imm_tools.graph import build_reverse_graph
+from imm_tools.rrsets import generate_rr_sets, generate_rr_sets_parallel
+
+# A directed 4-node graph with a cycle through every node, so walks can both
+# stop on their own and stop by returning to a node already in the set
+EDGES = [(0, 1, 0.5), (2, 1, 0.3), (1, 2, 0.6), (0, 2, 0.4), (1, 0, 0.2), (3, 0, 0.7), (2, 3, 0.9)]
+
+
+@pytest.fixture
+def graph():
+    sources, targets, weights = zip(*EDGES)
+    return build_reverse_graph(sources, targets, weights, undirected=False)
+
+
+def exact_distribution(graph):
+    """Probability of every RR set (as the node sequence of its walk), by enumerating walks."""
+    probabilities = Counter()
+
+    def walk(path, probability):
+        current = path[-1]
+        start, end = graph.offsets[current], graph.offsets[current + 1]
+        weights = graph.weights[start:end].astype(float)
+        probabilities[tuple(path)] += probability * max(1 - weights.sum(), 0.0)
+        for source, weight in zip(graph.sources[start:end], weights):
+            if source in path:
+                probabilities[tuple(path)] += probability * weight
+            else:
+                walk(path + [int(source)], probability * weight)
+
+    for root in range(graph.num_nodes):
+        walk([root], 1 / graph.num_nodes)
+    return probabilities
+
+
+def sampled_distribution(offsets, nodes):
+    count = len(offsets) - 1
+    sets = Counter(tuple(nodes[offsets[i]:offsets[i + 1]]) for i in range(count))
+    return {rr_set: hits / count for rr_set, hits in sets.items()}, count
+
+
+def assert_matches(sampled, count, exact):
+    assert set(sampled) <= set(exact)
+    assert sum(exact.values()) == pytest.approx(1.0)
+    for rr_set, probability in exact.items():
+        # Five standard errors of a binomial frequency
+        tolerance = 5 * np.sqrt(probability * (1 - probability) / count) + 1e-9
+        assert abs(sampled.get(rr_set, 0.0) - probability) <= tolerance, rr_set
+
+
+@pytest.mark.parametrize("batch", [4096, 7])
+def test_lt_rr_sets_follow_the_exact_distribution(graph, batch):
+    offsets, nodes = generate_rr_sets(graph, 200000, np.random.default_rng(1), batch)
+    assert offsets[0] == 0 and offsets[-1] == len(nodes)
+    assert nodes.dtype == np.int32
+    sampled, count = sampled_distribution(offsets, nodes)
+    assert_matches(sampled, count, exact_distribution(graph))
+
+
+def test_rr_sets_never_repeat_a_node(graph):
+    offsets, nodes = generate_rr_sets(graph, 20000, np.random.default_rng(2))
+    sizes = np.diff(offsets)
+    assert sizes.min() >= 1 and sizes.max() <= graph.num_nodes
+    for i in range(len(sizes)):
+        rr_set = nodes[offsets[i]:offsets[i + 1]]
+        assert len(set(rr_set.tolist())) == len(rr_set)
+
+
+def test_parallel_generation_matches_the_exact_distribution(graph, tmp_path):
+    path = tmp_path / "tiny-LT.txt"
+    path.write_text("".join(f"{u} {v} {w}\n" for u, v, w in EDGES))
+    with generate_rr_sets_parallel(str(path), 60000, workers=3, seed=3, undirected=False) as rr_sets:
+        sampled, count = sampled_distribution(rr_sets.offsets, rr_sets.nodes)
+    assert count == 60000
+    assert_matches(sampled, count, exact_distribution(graph))
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from imm_tools.graph import build_reverse_graph
+from imm_tools.rrsets import generate_rr_sets
+from imm_tools.selection import inverted_index, select_seeds
+
+
+def plain_greedy(offsets, nodes, num_nodes, k):
+    """Greedy max coverage recomputing every node's gain each round (ties to the smallest id)."""
+    sets = [set(nodes[offsets[i]:offsets[i + 1]].tolist()) for i in range(len(offsets) - 1)]
+    covered = np.zeros(len(sets), dtype=bool)
+    seeds, gains = [], []
+    for _ in range(k):
+        gain = np.zeros(num_nodes, dtype=np.int64)
+        for i, rr_set in enumerate(sets):
+            if not covered[i]:
+                for node in rr_set:
+                    gain[node] += 1
+        node = int(np.argmax(gain))
+        if gain[node] == 0:
+            break
+        covered |= np.array([node in rr_set for rr_set in sets])
+        seeds.append(node)
+        gains.append(int(gain[node]))
+    return seeds, gains, covered.mean()
+
+
+def random_rr_sets(seed, num_sets, num_nodes, max_size):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, max_size + 1, size=num_sets)
+    offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+    nodes = np.concatenate([rng.choice(num_nodes, size=size, replace=False) for size in sizes])
+    return offsets, nodes.astype(np.int32)
+
+
+def test_inverted_index_lists_the_sets_of_every_node():
+    offsets, nodes = random_rr_sets(0, 200, 30, 6)
+    index_offsets, set_ids = inverted_index(offsets, nodes, 30)
+    for node in range(30):
+        expected = [i for i in range(200) if node in nodes[offsets[i]:offsets[i + 1]]]
+        assert sorted(set_ids[index_offsets[node]:index_offsets[node + 1]].tolist()) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_celf_matches_plain_greedy(seed):
+    # Small node ranges give many ties between gains
+    offsets, nodes = random_rr_sets(seed, 500, 40, 5)
+    seeds, gains, coverage = select_seeds(offsets, nodes, 40, 10)
+    expected_seeds, expected_gains, expected_coverage = plain_greedy(offsets, nodes, 40, 10)
+    assert seeds == expected_seeds
+    assert gains == expected_gains
+    assert coverage == pytest.approx(expected_coverage)
+
+
+def test_celf_on_lt_rr_sets_and_more_seeds_than_useful():
+    graph = build_reverse_graph([0, 1, 2, 3, 4, 0], [1, 2, 3, 4, 0, 5])
+    offsets, nodes = generate_rr_sets(graph, 3000, np.random.default_rng(4))
+    # Beyond full coverage no node adds anything, so fewer than k seeds come back
+    seeds, gains, coverage = select_seeds(offsets, nodes, graph.num_nodes, graph.num_nodes)
+    expected = plain_greedy(offsets, nodes, graph.num_nodes, graph.num_nodes)
+    assert (seeds, gains) == expected[:2]
+    assert coverage == pytest.approx(1.0)
+    assert sum(gains) == len(offsets) - 1
@@ -0,0 +1,45 @@
+import os
+
+import pandas as pd
+import pytest
+
+from imm_tools.store import load_results, write_store
+
+pytest.importorskip("pyarrow")
+
+COLUMNS = ["cores", "total_time"]
+
+
+@pytest.fixture
+def sources(tmp_path):
+    store = tmp_path / "results.parquet"
+    write_store([{"campaign": "scaling", "dataset": "com-dblp", "algorithm": "1D",
+                  "cores": 24, "total_time": 10.0}], str(store))
+    csv = tmp_path / "results.csv"
+    pd.DataFrame({"algorithm": ["1D"], "cores": [24], "total time": [7.0]}).to_csv(csv, index=False)
+    return str(store), str(csv)
+
+
+def load(store, csv):
+    return load_results(COLUMNS, filters=[("campaign", "==", "scaling"), ("algorithm", "==", "1D")],
+                        fallback_csv=csv, store=store)
+
+
+def test_store_wins_when_newer(sources):
+    store, csv = sources
+    os.utime(csv, (1000, 1000))
+    assert load(store, csv)["total_time"].tolist() == [10.0]
+
+
+def test_newer_csv_wins_over_a_stale_store(sources, capsys):
+    store, csv = sources
+    os.utime(store, (1000, 1000))
+    assert load(store, csv)["total_time"].tolist() == [7.0]
+    assert "newer than" in capsys.readouterr().err
+
+
+def test_store_without_the_figure_rows_falls_back_to_the_csv(sources):
+    store, csv = sources
+    os.utime(csv, (1000, 1000))
+    df = load_results(COLUMNS, filters=[("campaign", "==", "k")], fallback_csv=csv, store=store)
+    assert df["total_time"].tolist() == [7.0]
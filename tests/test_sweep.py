@@ -0,0 +1,122 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from imm_tools.journal import Journal
+from imm_tools.sweep import (LocalLauncher, NodePool, _preset, adaptive_sweep, expand, make_cell,
+                             run_sweep, schedule)
+
+# Stand-in for production / production_2D: prints a "Total Time:" line (1D
+# runs always take 5 s, 2D runs alternate between 1 s and 9 s) and exits with
+# 1 if its run is named in $FAIL.
+STAND_IN = """#!{python}
+import os, sys, time
+name = sys.argv[sys.argv.index("-o") + 1][len("inf_"):-len(".txt")]
+time.sleep(float(os.environ.get("SLEEP", "0")))
+if name == os.environ.get("FAIL"):
+    sys.exit(1)
+rep = int(name.rsplit("_r", 1)[1])
+print("Total Time:", 5.0 if "_1D_" in name else (1.0 if rep % 2 else 9.0))
+"""
+
+
+@pytest.fixture
+def stand_in(tmp_path):
+    path = tmp_path / "fake_imm.py"
+    path.write_text(STAND_IN.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return LocalLauncher(str(path))
+
+
+@pytest.fixture
+def sweep(tmp_path):
+    return _preset("k", "com-dblp", str(tmp_path / "results"),
+                   nodes=["a", "b"], cores_per_node=4, cores=[4], k=[8], reps=2)
+
+
+def quiet(message):
+    pass
+
+
+def test_pool_packs_small_runs_first_fit():
+    pool = NodePool(["a", "b", "c"], 4)
+    assert pool.acquire(2) == ["a"]
+    assert pool.acquire(2) == ["a"]
+    assert pool.acquire(3) == ["b"]
+    # Multi-node runs only take idle nodes
+    assert pool.acquire(8) is None
+    assert pool.acquire(1) == ["b"]
+    pool.release(["a"], 2)
+    assert pool.acquire(4) == ["c"]
+    assert pool.free == {"a": 2, "b": 0, "c": 0}
+
+
+def test_pool_without_packing_gives_whole_nodes():
+    pool = NodePool(["a", "b", "c"], 4, pack=False)
+    assert pool.acquire(1) == ["a"]
+    assert pool.acquire(8) == ["b", "c"]
+    assert pool.acquire(1) is None
+    pool.release(["b", "c"], 8)
+    assert pool.acquire(2) == ["b"]
+
+
+def test_schedule_backfills_and_runs_everything(sweep, stand_in, monkeypatch):
+    monkeypatch.setenv("SLEEP", "0.3")
+    cells = [make_cell(sweep, "1D", cores, 8, 0.13, rep)
+             for rep, cores in enumerate([2, 8, 2, 4], start=1)]
+    started = []
+    finished = schedule(sweep, cells, stand_in, poll=0.01,
+                        log=lambda message: started.append(message.split()[1])
+                        if message.startswith(">>>") else None)
+
+    assert sorted(cell["name"] for cell, _ in finished) == sorted(cell["name"] for cell in cells)
+    assert all(returncode == 0 for _, returncode in finished)
+    # The two-node run waits for both nodes; the 4-core run is started past it
+    assert started == ["k8_1D_r1", "k8_1D_r3", "k8_1D_r4", "k8_1D_r2"]
+    for cell in cells:
+        assert os.path.exists(os.path.join(sweep["output_dir"], f"log_{cell['name']}.txt"))
+
+
+def test_schedule_rejects_runs_larger_than_the_allocation(sweep, stand_in):
+    with pytest.raises(ValueError):
+        schedule(sweep, [make_cell(sweep, "1D", 12, 8, 0.13, 1)], stand_in, log=quiet)
+
+
+def test_resume_reruns_only_failed_and_incomplete_runs(sweep, stand_in, monkeypatch):
+    cells = expand(sweep)
+    monkeypatch.setenv("FAIL", "k8_2D_r1")
+    entries = run_sweep(sweep, cells, stand_in, poll=0.01, log=quiet)
+    assert {entry["name"]: entry["status"] for entry in entries} == {
+        "k8_1D_r1": "done", "k8_2D_r1": "failed", "k8_1D_r2": "done", "k8_2D_r2": "done"}
+
+    # A log cut short after the journal said done is run again too
+    with open(os.path.join(sweep["output_dir"], "log_k8_1D_r2.txt"), 'w') as file:
+        file.write("Total Number of Nodes in G: 10\n")
+    monkeypatch.delenv("FAIL")
+    assert [cell["name"] for cell in Journal(sweep["output_dir"]).pending(cells)] == [
+        "k8_2D_r1", "k8_1D_r2"]
+    entries = run_sweep(sweep, cells, stand_in, poll=0.01, log=quiet)
+    assert sorted(entry["name"] for entry in entries) == ["k8_1D_r2", "k8_2D_r1"]
+    assert all(entry["status"] == "done" for entry in entries)
+
+    assert run_sweep(sweep, cells, stand_in, poll=0.01, log=quiet) == []
+
+
+def test_sibling_output_dirs_keep_separate_journals(sweep, stand_in, tmp_path):
+    run_sweep(sweep, expand(sweep), stand_in, poll=0.01, log=quiet)
+    other = dict(sweep, output_dir=str(tmp_path / "results_v2"))
+    entries = run_sweep(other, expand(other), stand_in, poll=0.01, log=quiet)
+    assert len(entries) == 4
+    assert len(Journal(sweep["output_dir"]).entries()) == 4
+    assert os.path.exists(os.path.join(other["output_dir"], ".sweep_journal.jsonl"))
+
+
+def test_adaptive_sweep_stops_on_narrow_intervals(sweep, stand_in):
+    result = adaptive_sweep(sweep, stand_in, target=0.05, min_reps=3, max_reps=6, poll=0.01, log=quiet)
+    # Identical 1D times close after the first round; noisy 2D times run to the cap
+    assert result[("1D", 4, 8, 0.13)] == (3, 0.0)
+    runs, width = result[("2D", 4, 8, 0.13)]
+    assert runs == 6 and width > 0.05
+    assert len(Journal(sweep["output_dir"]).entries()) == 9
@@ -0,0 +1,29 @@
+import pytest
+
+from imm_tools.timeline import dominant_round, dominant_summary, timeline_rows
+
+
+def rounds(*times):
+    return [{"round": i, "delta_pe": None, "rr_time": rr, "select_time": select,
+             "matrixGen_time": None, "kloops_time": None, "coverage": None}
+            for i, (rr, select) in enumerate(times, start=1)]
+
+
+def run(name):
+    return {"source": "figure8/DBLP/results", "file": f"log_{name}.txt", "campaign": "k"}
+
+
+def test_dominant_round_is_the_slowest_one():
+    rows = timeline_rows(run("k8_1D_r1"), rounds((1.0, 0.5), (4.0, 1.0), (2.0, 0.5)))
+    assert dominant_round(rows)["round"] == 2
+    assert dominant_round(rows)["round_share"] == pytest.approx(5 / 9, abs=1e-6)
+    assert dominant_round(timeline_rows(run("k8_1D_r2"), rounds((None, None)))) is None
+
+
+def test_summary_counts_runs_whose_last_round_dominates():
+    rows = (timeline_rows(run("k8_1D_r1"), rounds((1.0, 0.0), (3.0, 0.0)))
+            + timeline_rows(run("k8_1D_r2"), rounds((3.0, 0.0), (1.0, 0.0)))
+            + timeline_rows(run("k8_1D_r3"), rounds((None, None))))
+    assert dominant_summary(rows) == ("Slowest round is the last one in 1 of 2 runs; "
+                                      "it takes 75% of the sampling time on average")
+    assert dominant_summary([]) == "No timed rounds"